@@ -1,5 +1,6 @@
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from rich import print as rprint
 from typer import Argument, Exit, Option, Typer
@@ -7,14 +8,14 @@ from typing_extensions import Annotated
 
 from syftbox.__version__ import __version__
 from syftbox.app.manager import install_app, list_app, uninstall_app
-from syftbox.client.base import SyftClientInterface
-from syftbox.client.client2 import SyftClient
-from syftbox.client.plugins.apps import find_and_run_script
 from syftbox.lib.client_config import SyftClientConfig
 from syftbox.lib.constants import DEFAULT_CONFIG_PATH
 from syftbox.lib.exceptions import ClientConfigException
 from syftbox.lib.workspace import SyftWorkspace
 
+if TYPE_CHECKING:
+    from syftbox.client.base import SyftClientInterface
+
 app = Typer(
     name="SyftBox Apps",
     help="Manage SyftBox apps",
@@ -94,6 +95,10 @@ def run(
     config_path: Annotated[Path, CONFIG_OPTS] = DEFAULT_CONFIG_PATH,
 ):
     """Run a Syftbox app"""
+
+    # lazy import to improve CLI startup performance
+    from syftbox.client.plugins.apps import find_and_run_script
+
     workspace = get_workspace(config_path)
 
     extra_args = []
@@ -128,7 +133,10 @@ def env(with_syftbox: bool = False):
 #     pass
 
 
-def get_client(config_path: Path) -> SyftClientInterface:
+def get_client(config_path: Path) -> "SyftClientInterface":
+    # lazy import to improve CLI startup performance
+    from syftbox.client.client2 import SyftClient
+
     try:
         conf = SyftClientConfig.load(config_path)
         return SyftClient(conf).as_context()
@@ -23,6 +23,7 @@ from syftbox.lib.client_config import SyftClientConfig
 from syftbox.lib.datasite import create_datasite
 from syftbox.lib.exceptions import SyftBoxException
 from syftbox.lib.ignore import IGNORE_FILENAME
+from syftbox.lib.lib import get_datasites
 from syftbox.lib.workspace import SyftWorkspace
 
 SCRIPT_DIR = Path(__file__).parent
@@ -241,7 +242,7 @@ class SyftClientContext(SyftClientInterface):
     @property
     def all_datasites(self) -> list[str]:
         """List all datasites in the workspace"""
-        return [d.name for d in self.workspace.datasites.iterdir() if (d.is_dir() and "@" in d.name)]
+        return get_datasites(self.workspace.datasites)
 
     def __repr__(self) -> str:
         return f"SyftClientContext<{self.config.email}, {self.config.data_dir}>"
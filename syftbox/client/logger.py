@@ -26,6 +26,8 @@ def setup_logger(
         level="DEBUG",
         rotation=None,
         compression=None,
+        # write to the file from a background thread, keeps disk I/O off the sync/app threads
+        enqueue=True,
     )
 
     # keep last 5 logs
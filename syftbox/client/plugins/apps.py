@@ -21,6 +21,7 @@ DEFAULT_INTERVAL = 10
 RUNNING_APPS = {}
 DEFAULT_APPS_PATH = Path(os.path.join(os.path.dirname(__file__), "..", "..", "..", "default_apps")).absolute().resolve()
 EVENT = threading.Event()
+HASH_BUFFER_SIZE = 1 << 20
 
 
 def path_without_virtualenvs() -> str:
@@ -261,17 +262,33 @@ def run_apps(apps_path: Path, client_config: Path):
                 RUNNING_APPS[os.path.basename(app)] = thread
 
 
-def get_file_hash(file_path, digest="md5") -> str:
-    with open(file_path, "rb") as f:
-        return hashlib.file_digest(f, digest)
+def get_file_hash(file_path, digest="sha256") -> str:
+    # unbuffered, file_digest reads straight into its own buffer
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, lambda: hashlib.new(digest, usedforsecurity=False)).hexdigest()
+
+        # python < 3.11, same as file_digest: hash through one reused buffer so memory
+        # stays at HASH_BUFFER_SIZE instead of growing with the (mapped or read) file size
+        h = hashlib.new(digest, usedforsecurity=False)
+        buf = bytearray(HASH_BUFFER_SIZE)
+        view = memoryview(buf)
+        while size := f.readinto(buf):
+            h.update(view[:size])
+        return h.hexdigest()
 
 
 def output_published(app_output, published_output) -> bool:
-    return (
-        os.path.exists(app_output)
-        and os.path.exists(published_output)
-        and get_file_hash(app_output, "md5") == get_file_hash(published_output, "md5")
-    )
+    try:
+        app_output_size = os.stat(app_output).st_size
+        published_output_size = os.stat(published_output).st_size
+    except FileNotFoundError:
+        return False
+
+    # files of different sizes can never hash the same, skip reading them
+    if app_output_size != published_output_size:
+        return False
+    return get_file_hash(app_output) == get_file_hash(published_output)
 
 
 def run_custom_app_config(app_config: SimpleNamespace, app_path: Path, client_config: Path):
@@ -1,2 +1,5 @@
 # TODO move to client config after refactor
 MAX_FILE_SIZE_MB = 10
+
+# number of queued changes processed together, their server metadata is fetched in a single call
+CONSUME_BATCH_SIZE = 100
@@ -1,34 +1,35 @@
+import copy
 import enum
-import hashlib
 import threading
 import zipfile
 from enum import Enum
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import py_fast_rsync
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from syftbox.client.base import SyftClientInterface
 from syftbox.client.exceptions import SyftServerError
-from syftbox.client.plugins.sync.constants import MAX_FILE_SIZE_MB
+from syftbox.client.plugins.sync.constants import CONSUME_BATCH_SIZE, MAX_FILE_SIZE_MB
 from syftbox.client.plugins.sync.endpoints import (
     apply_diff,
     create,
     delete,
-    download,
     download_bulk,
+    download_to_file,
     get_diff,
     get_metadata,
+    get_metadata_batch,
 )
 from syftbox.client.plugins.sync.exceptions import FatalSyncError, SyncEnvironmentError
 from syftbox.client.plugins.sync.queue import SyncQueue, SyncQueueItem
 from syftbox.client.plugins.sync.sync import DatasiteState, SyncSide
 from syftbox.lib.ignore import filter_ignored_paths
 from syftbox.lib.lib import SyftPermission
-from syftbox.server.sync.hash import hash_file
+from syftbox.server.sync.hash import hash_file, sha256_hexdigest
 from syftbox.server.sync.models import FileMetadata
 
 
@@ -40,19 +41,20 @@ class SyncDecisionType(Enum):
 
 
 def update_local(client: SyftClientInterface, local_syncstate: FileMetadata, remote_syncstate: FileMetadata):
-    diff = get_diff(client.server_client, local_syncstate.path, local_syncstate.signature_bytes)
+    # pass the signature as stored (base85), decoding it here would only re-encode it for the request
+    diff = get_diff(client.server_client, local_syncstate.path, local_syncstate.signature)
     abs_path = client.workspace.datasites / local_syncstate.path
     local_data = abs_path.read_bytes()
 
     new_data = py_fast_rsync.apply(local_data, diff.diff_bytes)
-    new_hash = hashlib.sha256(new_data).hexdigest()
+    new_hash = sha256_hexdigest(new_data)
 
     if new_hash != diff.hash:
         # TODO handle
         raise ValueError("hash mismatch")
 
     # TODO implement safe write with tempfile + rename
-    abs_path.parent.mkdir(parents=True, exist_ok=True)
+    # no mkdir needed, the parent exists since we just read the file from it
     abs_path.write_bytes(new_data)
 
 
@@ -75,9 +77,7 @@ def delete_remote(client: SyftClientInterface, local_syncstate: FileMetadata):
 
 def create_local(client: SyftClientInterface, remote_syncstate: FileMetadata):
     abs_path = client.workspace.datasites / remote_syncstate.path
-    content_bytes = download(client.server_client, remote_syncstate.path)
-    abs_path.parent.mkdir(parents=True, exist_ok=True)
-    abs_path.write_bytes(content_bytes)
+    download_to_file(client.server_client, remote_syncstate.path, abs_path)
 
 
 def create_local_batch(client: SyftClientInterface, remote_syncstates: list[Path]) -> list[str]:
@@ -108,6 +108,21 @@ class SyncActionType(Enum):
     MODIFY_LOCAL = enum.auto()
 
 
+_ACTION_TYPES = {
+    (SyncDecisionType.CREATE, SyncSide.LOCAL): SyncActionType.CREATE_LOCAL,
+    (SyncDecisionType.CREATE, SyncSide.REMOTE): SyncActionType.CREATE_REMOTE,
+    (SyncDecisionType.DELETE, SyncSide.LOCAL): SyncActionType.DELETE_LOCAL,
+    (SyncDecisionType.DELETE, SyncSide.REMOTE): SyncActionType.DELETE_REMOTE,
+    (SyncDecisionType.MODIFY, SyncSide.LOCAL): SyncActionType.MODIFY_LOCAL,
+    (SyncDecisionType.MODIFY, SyncSide.REMOTE): SyncActionType.MODIFY_REMOTE,
+}
+
+
+# remote actions that are not checked against the server state by the server itself,
+# these are never executed on a prefetched server state
+_STALE_STATE_UNSAFE_ACTIONS = {SyncActionType.CREATE_REMOTE, SyncActionType.DELETE_REMOTE}
+
+
 class SyncDecision(BaseModel):
     operation: SyncDecisionType
     side_to_update: SyncSide
@@ -116,19 +131,20 @@ class SyncDecision(BaseModel):
     is_executed: bool = False
 
     def execute(self, client: SyftClientInterface):
-        if self.operation == SyncDecisionType.NOOP:
+        action_type = self.action_type
+        if action_type == SyncActionType.NOOP:
             pass
-        elif self.action_type == SyncActionType.CREATE_REMOTE:
+        elif action_type == SyncActionType.CREATE_REMOTE:
             create_remote(client, self.local_syncstate)
-        elif self.action_type == SyncActionType.CREATE_LOCAL:
+        elif action_type == SyncActionType.CREATE_LOCAL:
             create_local(client, self.remote_syncstate)
-        elif self.action_type == SyncActionType.DELETE_REMOTE:
+        elif action_type == SyncActionType.DELETE_REMOTE:
             delete_remote(client, self.remote_syncstate)
-        elif self.action_type == SyncActionType.DELETE_LOCAL:
+        elif action_type == SyncActionType.DELETE_LOCAL:
             delete_local(client, self.local_syncstate)
-        elif self.action_type == SyncActionType.MODIFY_REMOTE:
+        elif action_type == SyncActionType.MODIFY_REMOTE:
             update_remote(client, self.local_syncstate, self.remote_syncstate)
-        elif self.action_type == SyncActionType.MODIFY_LOCAL:
+        elif action_type == SyncActionType.MODIFY_LOCAL:
             update_local(client, self.local_syncstate, self.remote_syncstate)
 
         self.is_executed = True
@@ -146,18 +162,7 @@ class SyncDecision(BaseModel):
     def action_type(self):
         if self.operation == SyncDecisionType.NOOP:
             return SyncActionType.NOOP
-        if self.operation == SyncDecisionType.CREATE and self.side_to_update == SyncSide.LOCAL:
-            return SyncActionType.CREATE_LOCAL
-        elif self.operation == SyncDecisionType.CREATE and self.side_to_update == SyncSide.REMOTE:
-            return SyncActionType.CREATE_REMOTE
-        elif self.operation == SyncDecisionType.DELETE and self.side_to_update == SyncSide.LOCAL:
-            return SyncActionType.DELETE_LOCAL
-        elif self.operation == SyncDecisionType.DELETE and self.side_to_update == SyncSide.REMOTE:
-            return SyncActionType.DELETE_REMOTE
-        elif self.operation == SyncDecisionType.MODIFY and self.side_to_update == SyncSide.LOCAL:
-            return SyncActionType.MODIFY_LOCAL
-        elif self.operation == SyncDecisionType.MODIFY and self.side_to_update == SyncSide.REMOTE:
-            return SyncActionType.MODIFY_REMOTE
+        return _ACTION_TYPES.get((self.operation, self.side_to_update))
 
     @classmethod
     def noop(
@@ -384,6 +389,26 @@ class LocalState(BaseModel):
     path: Path
     states: dict[Path, FileMetadata] = {}
 
+    # writers copy `states`, mutate the copy and swap it in under this lock,
+    # so readers can use `states` without locking and `save` always serializes a stable snapshot
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+
+    def __deepcopy__(self, memo: Optional[dict] = None) -> "LocalState":
+        # locks can't be copied, the copy gets its own
+        with self._lock:
+            states = copy.deepcopy(self.states, memo)
+        return self.__class__(path=self.path, states=states)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # locks can't be pickled, the lock is left out and a new one is created by __setstate__
+        state = super().__getstate__()
+        private = {k: v for k, v in state["__pydantic_private__"].items() if k != "_lock"}
+        return {**state, "__pydantic_private__": private}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._lock = threading.RLock()
+
     def insert(self, path: Path, state: FileMetadata):
         if not isinstance(path, Path):
             raise ValueError(f"path must be a Path object, got {path}")
@@ -395,21 +420,24 @@ class LocalState(BaseModel):
             # during syncing and might cause unexpected behavior like deleting files on the remote
             raise SyncEnvironmentError("Your previous sync state has been deleted by a different process.")
 
-        if state is None:
-            self.states.pop(path, None)
-        else:
-            self.states[path] = state
-        self.save()
+        with self._lock:
+            states = dict(self.states)
+            if state is None:
+                states.pop(path, None)
+            else:
+                states[path] = state
+            self.states = states
+            self.save()
 
     def save(self):
         try:
-            with threading.Lock():
+            with self._lock:
                 self.path.write_text(self.model_dump_json())
         except Exception:
             logger.exception(f"Failed to save {self.path}")
 
     def load(self):
-        with threading.Lock():
+        with self._lock:
             if self.path.exists():
                 data = self.path.read_text()
                 loaded_state = self.model_validate_json(data)
@@ -423,6 +451,8 @@ class SyncConsumer:
         self.client = client
         self.queue = queue
         self.previous_state = LocalState(path=Path(client.workspace.plugins) / "local_syncstate.json")
+        # server states fetched in bulk for the batch being consumed, each is used once
+        self.prefetched_server_states: dict[Path, Optional[FileMetadata]] = {}
         try:
             self.previous_state.load()
         except Exception as e:
@@ -436,15 +466,36 @@ class SyncConsumer:
 
     def consume_all(self):
         while not self.queue.empty():
-            self.validate_sync_environment()
-            item = self.queue.get(timeout=0.1)
+            items: list[SyncQueueItem] = []
+            while len(items) < CONSUME_BATCH_SIZE and not self.queue.empty():
+                items.append(self.queue.get(timeout=0.1))
+
+            self.prefetch_server_states([item.data.path for item in items])
             try:
-                self.process_filechange(item)
-            except FatalSyncError as e:
-                # Fatal error, syncing should be interrupted
-                raise e
-            except Exception as e:
-                logger.error(f"Failed to sync file {item.data.path}, it will be retried in the next sync. Reason: {e}")
+                for item in items:
+                    self.validate_sync_environment()
+                    try:
+                        self.process_filechange(item)
+                    except FatalSyncError as e:
+                        # Fatal error, syncing should be interrupted
+                        raise e
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to sync file {item.data.path}, it will be retried in the next sync. Reason: {e}"
+                        )
+            finally:
+                self.prefetched_server_states.clear()
+
+    def prefetch_server_states(self, paths: list[Path]) -> None:
+        try:
+            server_states = get_metadata_batch(self.client.server_client, paths)
+        except Exception as e:
+            # e.g. servers without the batch endpoint, states are fetched per file instead
+            logger.debug(f"Failed to prefetch server states, falling back to per file requests. Reason: {e}")
+            return
+
+        self.prefetched_server_states = {path: None for path in paths}
+        self.prefetched_server_states.update({state.path: state for state in server_states})
 
     def download_all_missing(self, datasite_states: list[DatasiteState]):
         try:
@@ -496,7 +547,14 @@ class SyncConsumer:
             self.previous_state.insert(path=item.data.path, state=decision.result_local_state)
 
     def process_filechange(self, item: SyncQueueItem) -> None:
+        is_prefetched = item.data.path in self.prefetched_server_states
         decisions = self.get_decisions(item)
+        if is_prefetched and decisions.remote_decision.action_type in _STALE_STATE_UNSAFE_ACTIONS:
+            # the queue holds each path once, so nothing earlier in this batch touched this file. But other
+            # clients can write it on the server while the batch is processed, which makes the prefetched state
+            # outdated. Decide again on the current server state, before deleting or creating a file on the
+            # server. get_decisions fetches it, the prefetched state has been used up
+            decisions = self.get_decisions(item)
         if not decisions.is_noop():
             logger.info(decisions.info_message)
         self.process_decision(item, decisions)
@@ -511,6 +569,8 @@ class SyncConsumer:
         return self.previous_state.states.get(path, None)
 
     def get_current_server_state(self, path: Path) -> Optional[FileMetadata]:
+        if path in self.prefetched_server_states:
+            return self.prefetched_server_states.pop(path)
         try:
             return get_metadata(self.client.server_client, path)
         except SyftServerError:
@@ -1,11 +1,15 @@
 import base64
+import os
+import sys
+import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, Union
 
 import httpx
 
 from syftbox.client.exceptions import SyftServerError
-from syftbox.server.sync.models import ApplyDiffResponse, DiffResponse, FileMetadata
+from syftbox.server.sync.constants import DIFF_HASH_HEADER, DIFF_MEDIA_TYPE
+from syftbox.server.sync.models import ApplyDiffResponse, DiffResponse, FileMetadata, RawDiffResponse
 
 
 class SyftNotFound(SyftServerError):
@@ -35,7 +39,9 @@ def get_datasite_states(client: httpx.Client, email: str) -> dict[str, list[File
 
     data = handle_json_response("/sync/datasite_states", response)
 
-    return {email: [FileMetadata(**item) for item in metadata_list] for email, metadata_list in data.items()}
+    return {
+        sys.intern(email): [FileMetadata(**item) for item in metadata_list] for email, metadata_list in data.items()
+    }
 
 
 def get_remote_state(client: httpx.Client, path: Path) -> list[FileMetadata]:
@@ -70,17 +76,37 @@ def get_metadata(client: httpx.Client, path: Path) -> FileMetadata:
     return FileMetadata(**response_data)
 
 
-def get_diff(client: httpx.Client, path: Path, signature: bytes) -> DiffResponse:
+def get_metadata_batch(client: httpx.Client, paths: list[Path]) -> list[FileMetadata]:
+    response = client.post(
+        "/sync/get_metadata_batch",
+        json={"paths": [path.as_posix() for path in paths]},
+    )
+
+    response_data = handle_json_response("/sync/get_metadata_batch", response)
+    return [FileMetadata(**item) for item in response_data]
+
+
+def get_diff(client: httpx.Client, path: Path, signature: Union[bytes, str]) -> RawDiffResponse:
+    """`signature` is either the raw rsync signature, or the base85 encoded one as stored in FileMetadata"""
+    if isinstance(signature, bytes):
+        signature = base64.b85encode(signature).decode("utf-8")
+
     response = client.post(
         "/sync/get_diff",
         json={
             "path": str(path),
-            "signature": base64.b85encode(signature).decode("utf-8"),
+            "signature": signature,
         },
+        headers={"Accept": DIFF_MEDIA_TYPE},
     )
 
+    if response.status_code == 200 and response.headers.get("content-type") == DIFF_MEDIA_TYPE:
+        return RawDiffResponse(path=path, diff_bytes=response.content, hash=response.headers[DIFF_HASH_HEADER])
+
+    # older servers always answer with a base85 encoded DiffResponse
     response_data = handle_json_response("/sync/get_diff", response)
-    return DiffResponse(**response_data)
+    diff = DiffResponse(**response_data)
+    return RawDiffResponse(path=diff.path, diff_bytes=diff.diff_bytes, hash=diff.hash)
 
 
 def apply_diff(client: httpx.Client, path: Path, diff: bytes, expected_hash: str) -> ApplyDiffResponse:
@@ -128,6 +154,27 @@ def download(client: httpx.Client, path: Path) -> bytes:
     return response.content
 
 
+def download_to_file(client: httpx.Client, path: Path, dest: Path, chunk_size: int = 1 << 20) -> None:
+    """Stream a file from the server straight to `dest` without buffering it in memory"""
+    with client.stream("POST", "/sync/download", json={"path": str(path)}) as response:
+        if response.status_code != 200:
+            response.read()
+            raise SyftNotFound(f"[/sync/download] not found on server: {path}, {response.text}")
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # stream into a file next to `dest` and rename it into place once the download is complete,
+        # an interrupted download never leaves a truncated file at `dest`
+        tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "xb") as f:
+                for chunk in response.iter_bytes(chunk_size=chunk_size):
+                    f.write(chunk)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
 def download_bulk(client: httpx.Client, paths: list[str]) -> bytes:
     response = client.post(
         "/sync/download_bulk",
@@ -1,5 +1,4 @@
-import time
-from threading import Thread
+from threading import Event, Thread
 from typing import Optional
 
 from loguru import logger
@@ -20,6 +19,8 @@ class SyncManager:
         self.sync_interval = 1  # seconds
         self.thread: Optional[Thread] = None
         self.is_stop_requested = False
+        # set together with is_stop_requested, wakes the sync thread up from its interval wait
+        self._stop_event = Event()
         self.sync_run_once = False
 
     def is_alive(self) -> bool:
@@ -27,6 +28,7 @@ class SyncManager:
 
     def stop(self, blocking: bool = False):
         self.is_stop_requested = True
+        self._stop_event.set()
         if blocking:
             self.thread.join()
 
@@ -35,12 +37,13 @@ class SyncManager:
             while not manager.is_stop_requested:
                 try:
                     manager.run_single_thread()
-                    time.sleep(manager.sync_interval)
+                    manager._stop_event.wait(manager.sync_interval)
                 except FatalSyncError as e:
                     logger.error(f"Syncing encountered a fatal error: {e}")
                     break
 
         self.is_stop_requested = False
+        self._stop_event.clear()
         t = Thread(target=_start, args=(self,), daemon=True)
         t.start()
         logger.info(f"Sync started, syncing every {self.sync_interval} seconds")
@@ -7,11 +7,19 @@ from typing import Dict, Optional
 from syftbox.client.plugins.sync.sync import FileChangeInfo
 
 
-@dataclass(order=True)
+@dataclass
 class SyncQueueItem:
+    __slots__ = ("priority", "data")
+
     priority: int
     data: FileChangeInfo
 
+    def __lt__(self, other: "SyncQueueItem") -> bool:
+        # same order as dataclass(order=True), without building two tuples on every heap comparison
+        if self.priority != other.priority:
+            return self.priority < other.priority
+        return self.data < other.data
+
 
 class SyncQueue:
     """
@@ -1,5 +1,6 @@
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -26,7 +27,7 @@ class FileChangeInfo(BaseModel, frozen=True):
     date_last_modified: datetime
     file_size: int = 1
 
-    @property
+    @cached_property
     def local_abs_path(self) -> Path:
         return self.local_sync_folder / self.path
 
@@ -90,7 +91,7 @@ class DatasiteState:
 {path_str}
         """
 
-    @property
+    @cached_property
     def path(self) -> Path:
         p = self.client.workspace.datasites / self.email
         return p.expanduser().resolve()
@@ -0,0 +1,56 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+__all__ = ["LRUCache", "MIN_MTIME_AGE", "is_recently_modified"]
+
+# some filesystems (HFS+, FAT/exFAT, network mounts) store mtimes with 1-2s resolution
+MIN_MTIME_AGE = 2.0
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe least recently used cache.
+
+    Holds at most `maxsize` entries, setting a new entry on a full cache evicts the least recently used one.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def is_recently_modified(stat: os.stat_result) -> bool:
+    """
+    True if the file was modified less than MIN_MTIME_AGE seconds ago.
+
+    Such a file can still change without its stat changing, caches keyed on its stat should not store it.
+    """
+    return time.time() - stat.st_mtime < MIN_MTIME_AGE
@@ -128,10 +128,12 @@ reset_password_token_email_template = """
 </html>
 """
 
+# compile once: jinja parses and compiles the template source to python code on every Template()
+_token_email_template = Template(token_email_template)
+
 
 def send_token_email(server_settings, user_email: str, token: str):
-    template = Template(token_email_template)
-    body = template.render(email=user_email, token=token)
+    body = _token_email_template.render(email=user_email, token=token)
     send_email(
         server_settings=server_settings,
         receiver_email=user_email,
@@ -1,9 +1,12 @@
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import pathspec
 from loguru import logger
+from pathspec.util import normalize_file
 
+from syftbox.lib.cache import LRUCache, is_recently_modified
 from syftbox.lib.types import PathLike, to_path
 
 IGNORE_FILENAME = "_.syftignore"
@@ -61,6 +64,77 @@ def get_ignore_rules(dir: Path) -> Optional[pathspec.PathSpec]:
     return None
 
 
+IGNORE_MATCHER_CACHE_SIZE = 128
+
+# ignore file path -> (st_mtime_ns, st_size, compiled matcher)
+_ignore_matcher_cache: LRUCache[str, tuple[int, int, Callable[[PathLike], bool]]] = LRUCache(
+    maxsize=IGNORE_MATCHER_CACHE_SIZE
+)
+
+
+def get_ignore_matcher(dir: Path) -> Optional[Callable[[PathLike], bool]]:
+    """
+    Get the compiled ignore rules from the _.syftignore file in the dir, or None if there is no ignore file.
+
+    The ignore file is only read and compiled again when its mtime or size changes,
+    or when it was modified too recently for its mtime to tell.
+    """
+    ignore_file = to_path(dir) / IGNORE_FILENAME
+    try:
+        stat = ignore_file.stat()
+    except OSError:
+        return None
+
+    key = str(ignore_file)
+    cached = _ignore_matcher_cache.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    ignore_rules = get_ignore_rules(dir)
+    if ignore_rules is None:
+        return None
+    matcher = compile_ignore_rules(ignore_rules)
+    if not is_recently_modified(stat):
+        _ignore_matcher_cache.set(key, (stat.st_mtime_ns, stat.st_size, matcher))
+    return matcher
+
+
+def compile_ignore_rules(ignore_rules: pathspec.PathSpec) -> Callable[[PathLike], bool]:
+    """
+    Compile the ignore rules into a single regex, returns a function that is equivalent to `ignore_rules.match_file`.
+
+    The last pattern that matches a path decides if it is ignored. The patterns are joined in reverse order,
+    so the first alternative that matches is that pattern, and the whole path is matched in one `re` call
+    instead of one per pattern. Falls back to `ignore_rules.match_file` if the patterns can't be combined.
+    """
+    patterns = [p for p in reversed(ignore_rules.patterns) if p.include is not None and p.regex is not None]
+    if not patterns:
+        return lambda path: False
+
+    alternatives = []
+    include_by_group = {}
+    for i, pattern in enumerate(patterns):
+        group = f"p{i}"
+        # the only capturing group in gitwildmatch regexes is the directory marker, which we don't need
+        regex = pattern.regex.pattern.replace("(?P<ps_d>", "(?:")
+        alternatives.append(f"(?P<{group}>{regex})")
+        include_by_group[group] = pattern.include
+
+    try:
+        combined = re.compile("|".join(alternatives))
+    except (re.error, TypeError):
+        return ignore_rules.match_file
+    # lastgroup only identifies the matching pattern if each alternative has exactly one group
+    if combined.groups != len(alternatives) or any(p.regex.flags != combined.flags for p in patterns):
+        return ignore_rules.match_file
+
+    def match_file(path: PathLike) -> bool:
+        match = combined.match(normalize_file(path))
+        return match is not None and include_by_group[match.lastgroup]
+
+    return match_file
+
+
 def is_within_symlinked_path(path: Path, datasites_dir: PathLike) -> bool:
     """
     Returns True if the path is within a symlinked path.
@@ -123,13 +197,8 @@ def filter_ignored_paths(
     if ignore_symlinks:
         relative_paths = filter_symlinks(datasites_dir, relative_paths)
 
-    ignore_rules = get_ignore_rules(datasites_dir)
-    if ignore_rules is None:
+    is_ignored = get_ignore_matcher(datasites_dir)
+    if is_ignored is None:
         return relative_paths
 
-    filtered_paths = []
-    for path in relative_paths:
-        if not ignore_rules.match_file(path):
-            filtered_paths.append(path)
-
-    return filtered_paths
+    return [path for path in relative_paths if not is_ignored(path)]
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PurePath
 
 from loguru import logger
 from typing_extensions import Any, Optional, Self, Union
@@ -16,15 +19,21 @@ USER_GROUP_GLOBAL = "GLOBAL"
 ICON_FILE = "Icon"  # special
 IGNORE_FILES = []
 
+_PRIMITIVES = (str, int, float, bool, type(None))
 
+# PermissionTree.from_path loads permission files in a thread pool above this count
+PERM_LOAD_PARALLEL_THRESHOLD = 8
+PERM_LOAD_MAX_WORKERS = 16
+
+
+# called for every directory level of every path in PermissionTree.permission_for_path
+@lru_cache(maxsize=4096)
 def perm_file_path(path: str) -> str:
     return os.path.join(path, PERM_FILE)
 
 
 def is_primitive_json_serializable(obj):
-    if isinstance(obj, (str, int, float, bool, type(None))):
-        return True
-    return False
+    return isinstance(obj, _PRIMITIVES)
 
 
 def pack(obj) -> Any:
@@ -47,12 +56,28 @@ def pack(obj) -> Any:
 
 
 class Jsonable:
+    @classmethod
+    def _public_fields(cls) -> Optional[tuple[str, ...]]:
+        # dataclass fields are only known after @dataclass has run, so resolve them
+        # lazily on first use and cache them on the concrete class
+        fields = cls.__dict__.get("_public_field_names")
+        if fields is None:
+            dataclass_fields = getattr(cls, "__dataclass_fields__", None)
+            if dataclass_fields is None:
+                return None
+            fields = tuple(k for k in dataclass_fields if not k.startswith("_"))
+            cls._public_field_names = fields
+        return fields
+
     def to_dict(self) -> dict:
+        fields = self._public_fields()
+        if fields is None:
+            fields = [k for k in self.__dict__ if not k.startswith("_")]
+
         output = {}
-        for k, v in self.__dict__.items():
-            if k.startswith("_"):
-                continue
-            output[k] = pack(v)
+        for k in fields:
+            v = getattr(self, k)
+            output[k] = v if isinstance(v, _PRIMITIVES) else pack(v)
         return output
 
     def __iter__(self):
@@ -69,7 +94,8 @@ class Jsonable:
     def load(cls, file_or_bytes: Union[str, Path, bytes]) -> Self:
         try:
             if isinstance(file_or_bytes, (str, Path)):
-                with open(file_or_bytes) as f:
+                # these are tiny files, skip the text and buffering layers and let json decode the bytes
+                with open(file_or_bytes, "rb", buffering=0) as f:
                     data = f.read()
             else:
                 data = file_or_bytes
@@ -102,7 +128,9 @@ class SyftPermission(Jsonable):
 
     @staticmethod
     def is_permission_file(path: Union[Path, str], check_exists: bool = False) -> bool:
-        path = Path(path)
+        # called for every queued change and synced file, don't rebuild paths that already are one
+        if not isinstance(path, PurePath) or check_exists:
+            path = Path(path)
         if check_exists and not path.is_file():
             return False
         return path.name == "_.syftperm"
@@ -215,13 +243,8 @@ class SyftPermission(Jsonable):
 
 
 def get_datasites(sync_folder: Union[str, Path]) -> list[str]:
-    sync_folder = str(sync_folder.resolve()) if isinstance(sync_folder, Path) else sync_folder
-    datasites = []
-    folders = os.listdir(sync_folder)
-    for folder in folders:
-        if "@" in folder:
-            datasites.append(folder)
-    return datasites
+    with os.scandir(sync_folder) as entries:
+        return [sys.intern(entry.name) for entry in entries if "@" in entry.name and entry.is_dir()]
 
 
 def build_tree_string(paths_dict, prefix=""):
@@ -241,6 +264,13 @@ def build_tree_string(paths_dict, prefix=""):
     return "\n".join(lines)
 
 
+def _load_permission_or_none(path: str) -> Optional[SyftPermission]:
+    try:
+        return SyftPermission.load(path)
+    except Exception:
+        return None
+
+
 @dataclass
 class PermissionTree(Jsonable):
     tree: dict[str, SyftPermission]
@@ -251,16 +281,26 @@ class PermissionTree(Jsonable):
 
     @classmethod
     def from_path(cls, parent_path, raise_on_corrupted_files: bool = False) -> Self:
-        corrupted_permission_files = []
-        perm_dict = {}
+        perm_paths = []
         for root, dirs, files in os.walk(parent_path):
             for file in files:
                 if file.endswith(".syftperm"):
-                    path = os.path.join(root, file)
-                    try:
-                        perm_dict[path] = SyftPermission.load(path)
-                    except Exception:
-                        corrupted_permission_files.append(path)
+                    perm_paths.append(os.path.join(root, file))
+
+        # permission files are tiny, the cost is in open/read latency, so overlap it
+        if len(perm_paths) > PERM_LOAD_PARALLEL_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=PERM_LOAD_MAX_WORKERS) as executor:
+                perms = list(executor.map(_load_permission_or_none, perm_paths))
+        else:
+            perms = [_load_permission_or_none(path) for path in perm_paths]
+
+        corrupted_permission_files = []
+        perm_dict = {}
+        for path, perm in zip(perm_paths, perms):
+            if perm is None:
+                corrupted_permission_files.append(path)
+            else:
+                perm_dict[path] = perm
 
         root_perm = None
         root_perm_path = perm_file_path(parent_path)
@@ -329,12 +369,19 @@ def filter_metadata(
     snapshot_folder: Path,
 ) -> list[FileMetadata]:
     filtered_metadata = []
+    # permissions are set per directory, so files in the same directory share the result
+    allowed_by_dir: dict[Path, bool] = {}
     for metadata in metadata_list:
-        perm_file_at_path = perm_tree.permission_for_path((snapshot_folder / metadata.path).as_posix())
-        if (
-            user_email in perm_file_at_path.read
-            or "GLOBAL" in perm_file_at_path.read
-            or user_email in perm_file_at_path.admin
-        ):
+        parent = metadata.path.parent
+        allowed = allowed_by_dir.get(parent)
+        if allowed is None:
+            perm_file_at_path = perm_tree.permission_for_path((snapshot_folder / metadata.path).as_posix())
+            allowed = (
+                user_email in perm_file_at_path.read
+                or "GLOBAL" in perm_file_at_path.read
+                or user_email in perm_file_at_path.admin
+            )
+            allowed_by_dir[parent] = allowed
+        if allowed:
             filtered_metadata.append(metadata)
     return filtered_metadata
@@ -8,6 +8,10 @@ from syftbox.lib.types import PathLike, to_path
 
 DIR_NOT_EMPTY = "Directory is not empty"
 
+# Define a regex pattern for a valid email
+# from: https://stackoverflow.com/a/21608610
+EMAIL_REGEX = re.compile(r"\w+([-+.']\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)*")
+
 
 def is_valid_dir(path: PathLike, check_empty=True, check_writable=True) -> Tuple[bool, str]:
     try:
@@ -44,11 +48,7 @@ def is_valid_dir(path: PathLike, check_empty=True, check_writable=True) -> Tuple
 
 
 def is_valid_email(email: str) -> bool:
-    # Define a regex pattern for a valid email
-    # from: https://stackoverflow.com/a/21608610
-    email_regex = r"\w+([-+.']\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)*"
-
     # Use the match method to check if the email fits the pattern
-    if re.match(email_regex, email):
+    if EMAIL_REGEX.match(email):
         return True
     return False
@@ -1,3 +1,5 @@
+import os
+
 from syftbox.lib.types import PathLike, to_path
 
 
@@ -35,6 +37,11 @@ class SyftWorkspace:
         """Path to the directory containing apps."""
 
     def mkdirs(self):
-        self.datasites.mkdir(parents=True, exist_ok=True)
-        self.plugins.mkdir(parents=True, exist_ok=True)
-        self.apps.mkdir(parents=True, exist_ok=True)
+        # create the root once, all workspace dirs are its direct children
+        os.makedirs(self.data_dir, exist_ok=True)
+        for path in (self.datasites, self.plugins, self.apps):
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                if not os.path.isdir(path):
+                    raise
@@ -1,8 +1,8 @@
 import json
 import zipfile
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Any, Optional
+from pathlib import Path, PosixPath, PurePath, WindowsPath
+from typing import Any, Callable, Optional
 
 from loguru import logger
 from pydantic import BaseModel
@@ -11,24 +11,48 @@ from syftbox.server.logger import analytics_logger
 from syftbox.server.sync.file_store import FileStore
 
 
+def _identity(value: Any) -> Any:
+    return value
+
+
+# exact-type converters, checked with a single dict lookup before the isinstance fallback
+_JSONABLE_CONVERTERS: dict[type, Callable[[Any], Any]] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+    datetime: datetime.isoformat,
+    PosixPath: PurePath.as_posix,
+    WindowsPath: PurePath.as_posix,
+}
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    elif isinstance(value, Path):
+        return value.as_posix()
+    elif isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    return str(value)
+
+
 def to_jsonable_dict(obj: dict) -> dict:
     """
     Convert log record to a JSON serializable dictionary.
     """
     result = {}
     for key, value in obj.items():
-        if isinstance(value, dict):
+        converter = _JSONABLE_CONVERTERS.get(type(value))
+        if converter is not None:
+            result[key] = converter(value)
+        elif isinstance(value, dict):
             result[key] = to_jsonable_dict(value)
-        elif isinstance(value, BaseModel):
-            result[key] = value.model_dump(mode="json")
-        elif isinstance(value, datetime):
-            result[key] = value.isoformat()
-        elif isinstance(value, Path):
-            result[key] = value.as_posix()
-        elif isinstance(value, (str, int, float, bool, type(None))):
-            result[key] = value
         else:
-            result[key] = str(value)
+            result[key] = _to_jsonable(value)
 
     return result
 
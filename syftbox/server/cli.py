@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import Annotated, Optional
 
@@ -74,10 +75,21 @@ def server(
     # lazy import to improve CLI startup performance
     import uvicorn
 
-    from syftbox.server.server import app as fastapi_app
+    if workers > 1:
+        # every worker runs the app lifespan. Hash the snapshot into the db once here,
+        # instead of in every worker at the same time against the same sqlite file
+        from syftbox.server.server import DB_INITIALIZED_ENV, create_folders, init_db
+        from syftbox.server.settings import ServerSettings
 
+        settings = ServerSettings()
+        create_folders(settings.folders)
+        init_db(settings)
+        os.environ[DB_INITIALIZED_ENV] = "1"
+
+    # uvicorn needs an import string to start more than one worker process.
+    # loop/http default to "auto", which picks uvloop and httptools when they are installed
     uvicorn.run(
-        app=fastapi_app,
+        app="syftbox.server.server:app",
         host="0.0.0.0",
         port=port,
         log_level="debug" if verbose else "info",
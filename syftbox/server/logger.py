@@ -22,8 +22,13 @@ def _analytics_logger_filter(record: dict):
 analytics_logger = logger.bind(event_type=ANALYTICS_EVENT)
 
 
+# analytics records are plain, already-jsonable dicts (see analytics.to_jsonable_dict),
+# so skip the circular reference check and write compact separators
+_analytics_encoder = json.JSONEncoder(check_circular=False, separators=(",", ":"))
+
+
 def analytics_formatter(record: dict):
-    serialized = json.dumps(record["extra"])
+    serialized = _analytics_encoder.encode(record["extra"])
     record["extra"]["serialized"] = serialized
     return "{extra[serialized]}\n"
 
@@ -1,15 +1,32 @@
 import time
 
-from fastapi import Request
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class LoguruMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
-        logger.info(f"{request.method} {request.url.path} {response.status_code} {duration:.2f}s")
+class LoguruMiddleware:
+    """
+    Pure ASGI request logger. Unlike BaseHTTPMiddleware, this does not spawn an extra task
+    or buffer the response through a queue, so streaming responses pass straight through.
+    """
 
-        return response
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        duration = time.perf_counter() - start_time
+        logger.info(f"{scope['method']} {scope['path']} {status_code} {duration:.2f}s")
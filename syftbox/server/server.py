@@ -6,8 +6,12 @@ import random
 import sys
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+import httpx
+from anyio import to_thread
 from fastapi import Depends, FastAPI, Header, Request
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import (
@@ -19,6 +23,7 @@ from fastapi.responses import (
 )
 from jinja2 import Template
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
 from typing_extensions import Any, Optional, Union
 
 from syftbox.__version__ import __version__
@@ -118,21 +123,32 @@ def create_folders(folders: list[str]) -> None:
             os.makedirs(folder, exist_ok=True)
 
 
+INIT_DB_BATCH_SIZE = 1000
+# set by the server cli for its worker processes, after it has run init_db itself
+DB_INITIALIZED_ENV = "SYFTBOX_SERVER_DB_INITIALIZED"
+
+
 def init_db(settings: ServerSettings) -> None:
+    # files left in the tmp folder were never moved into the snapshot, e.g. the server stopped during a write
+    if settings.tmp_folder.is_dir():
+        for tmp_file in settings.tmp_folder.iterdir():
+            tmp_file.unlink()
+
     # might take very long as snapshot folder grows
     logger.info(f"> Collecting Files from {settings.snapshot_folder.absolute()}")
     files = hash.collect_files(settings.snapshot_folder.absolute())
-    logger.info("> Hashing files")
-    metadata = hash.hash_files(files, settings.snapshot_folder)
-    logger.info(f"> Updating file hashes at {settings.file_db_path.absolute()}")
+    logger.info(f"> Hashing files and updating file hashes at {settings.file_db_path.absolute()}")
+    # hashes are written in batches as they come in, instead of holding the metadata of the whole snapshot
+    # in memory. Each batch is hashed before its write transaction starts and committed right after,
+    # so the db write lock is never held while files are being hashed
+    metadata = hash.iter_hash_files_parallel(files, settings.snapshot_folder)
     con = db.get_db(settings.file_db_path.absolute())
-    cur = con.cursor()
-    for m in metadata:
-        db.save_file_metadata(cur, m)
+    while batch := list(islice(metadata, INIT_DB_BATCH_SIZE)):
+        with con:
+            db.save_file_metadata_batch(con, batch)
 
-    cur.close()
-    con.commit()
-    con.close()
+
+THREADPOOL_SIZE = 100
 
 
 @contextlib.asynccontextmanager
@@ -154,12 +170,20 @@ async def lifespan(app: FastAPI, settings: Optional[ServerSettings] = None):
     logger.info("> Loading Users")
     logger.info(users)
 
-    init_db(settings)
+    # with multiple workers the server cli initializes the db once, before the workers are started
+    if os.environ.get(DB_INITIALIZED_ENV) != "1":
+        init_db(settings)
 
-    yield {
-        "server_settings": settings,
-        "users": users,
-    }
+    # every sync (def) endpoint holds a worker thread while it runs, anyio's default is 40
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # shared client so outgoing requests (e.g. emails) reuse pooled connections
+    async with httpx.AsyncClient(timeout=10.0) as http_client:
+        yield {
+            "server_settings": settings,
+            "users": users,
+            "http_client": http_client,
+        }
 
     logger.info("> Shutting down server")
 
@@ -168,7 +192,7 @@ app = FastAPI(lifespan=lifespan)
 app.include_router(emails_router)
 app.include_router(sync_router)
 app.include_router(users_router)
-app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=1)
 app.add_middleware(LoguruMiddleware)
 
 # Define the ASCII art
@@ -209,6 +233,13 @@ async def get_wheel(path: str):
     return filename
 
 
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    """Read and compile a bundled template once, templates are static for the lifetime of the server"""
+    with open(current_dir / "templates" / name) as f:
+        return Template(f.read())
+
+
 def get_file_list(directory: Union[str, Path] = ".") -> list[dict[str, Any]]:
     # TODO rewrite with pathlib
     directory = str(directory)
@@ -227,12 +258,9 @@ def get_file_list(directory: Union[str, Path] = ".") -> list[dict[str, Any]]:
 
 @app.get("/datasites", response_class=HTMLResponse)
 async def list_datasites(request: Request, server_settings: ServerSettings = Depends(get_server_settings)):
-    files = get_file_list(server_settings.snapshot_folder)
-    template_path = current_dir / "templates" / "datasites.html"
-    html = ""
-    with open(template_path) as f:
-        html = f.read()
-    template = Template(html)
+    # directory listings stat every entry, keep them off the event loop
+    files = await run_in_threadpool(get_file_list, server_settings.snapshot_folder)
+    template = load_template("datasites.html")
 
     html_content = template.render(
         {
@@ -270,9 +298,7 @@ async def browse_datasite(
             if slug_path.endswith(".html") or slug_path.endswith(".htm"):
                 return FileResponse(slug_path)
             elif slug_path.endswith(".md"):
-                with open(slug_path, "r") as file:
-                    content = file.read()
-                return PlainTextResponse(content)
+                return FileResponse(slug_path, media_type="text/plain")
             elif slug_path.endswith(".json") or slug_path.endswith(".jsonl"):
                 return FileResponse(slug_path, media_type="application/json")
             elif slug_path.endswith(".yaml") or slug_path.endswith(".yml"):
@@ -290,17 +316,11 @@ async def browse_datasite(
 
         index_file = os.path.abspath(slug_path + "/" + "index.html")
         if os.path.exists(index_file):
-            with open(index_file, "r") as file:
-                html_content = file.read()
-            return HTMLResponse(content=html_content, status_code=200)
+            return FileResponse(index_file, media_type="text/html")
 
         if os.path.isdir(slug_path):
-            files = get_file_list(slug_path)
-            template_path = current_dir / "templates" / "folder.html"
-            html = ""
-            with open(template_path) as f:
-                html = f.read()
-            template = Template(html)
+            files = await run_in_threadpool(get_file_list, slug_path)
+            template = load_template("folder.html")
             html_content = template.render(
                 {
                     "datasite": datasite_part,
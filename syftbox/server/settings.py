@@ -65,12 +65,17 @@ class ServerSettings(BaseSettings):
 
     @property
     def folders(self) -> list[Path]:
-        return [self.data_folder, self.snapshot_folder]
+        return [self.data_folder, self.snapshot_folder, self.tmp_folder]
 
     @property
     def snapshot_folder(self) -> Path:
         return self.data_folder / "snapshot"
 
+    @property
+    def tmp_folder(self) -> Path:
+        """Files being written, outside the snapshot so they are never indexed or served as datasite files"""
+        return self.data_folder / "tmp"
+
     @property
     def logs_folder(self) -> Path:
         return self.data_folder / "logs"
@@ -0,0 +1,3 @@
+# get_diff returns the raw diff when the client accepts this media type
+DIFF_MEDIA_TYPE = "application/octet-stream"
+DIFF_HASH_HEADER = "X-Syft-Hash"
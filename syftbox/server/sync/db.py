@@ -1,23 +1,52 @@
 import os
 import shutil
 import sqlite3
+import sys
 import tempfile
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from syftbox.server.settings import ServerSettings
 from syftbox.server.sync.models import FileMetadata
 
+# stay below SQLITE_MAX_VARIABLE_NUMBER (999 before sqlite 3.32)
+MAX_QUERY_PARAMS = 900
 
-# @contextlib.contextmanager
-def get_db(path: str):
+# connections are cached per thread and per database path, see get_db
+_local = threading.local()
+
+
+def get_db(path: str) -> sqlite3.Connection:
+    """
+    Get this thread's connection to the database at `path`.
+
+    Connecting and setting up the pragmas/schema is done once per thread instead of on every call,
+    callers should not close the returned connection.
+    """
+    connections: dict[str, sqlite3.Connection] = _local.__dict__.setdefault("connections", {})
+    key = str(path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = _connect(key)
+        connections[key] = conn
+    return conn
+
+
+def _connect(path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(path, check_same_thread=False)
 
     with conn:
-        conn.execute("PRAGMA cache_size=10000;")
-        conn.execute("PRAGMA synchronous=OFF;")
+        # WAL: readers don't block the writer and vice versa. synchronous=NORMAL is safe in WAL mode
+        # and only syncs on checkpoints. Negative cache_size is in KiB (64MB)
         conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
         conn.execute("PRAGMA busy_timeout=5000;")
+        conn.execute("PRAGMA cache_size=-64000;")
+        conn.execute("PRAGMA mmap_size=268435456;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        # truncate the WAL file after checkpoints, instead of letting it keep its largest size
+        conn.execute("PRAGMA journal_size_limit=67108864;")
         # Create the table if it doesn't exist
         conn.execute("""
         CREATE TABLE IF NOT EXISTS file_metadata (
@@ -31,10 +60,7 @@ def get_db(path: str):
     return conn
 
 
-def save_file_metadata(conn: sqlite3.Connection, metadata: FileMetadata):
-    # Insert the metadata into the database or update if a conflict on 'path' occurs
-    conn.execute(
-        """
+SAVE_FILE_METADATA_QUERY = """
     INSERT INTO file_metadata (path, hash, signature, file_size, last_modified)
     VALUES (?, ?, ?, ?, ?)
     ON CONFLICT(path) DO UPDATE SET
@@ -42,17 +68,30 @@ def save_file_metadata(conn: sqlite3.Connection, metadata: FileMetadata):
         signature = excluded.signature,
         file_size = excluded.file_size,
         last_modified = excluded.last_modified
-    """,
-        (
-            str(metadata.path),
-            metadata.hash,
-            metadata.signature,
-            metadata.file_size,
-            metadata.last_modified.isoformat(),
-        ),
+    """
+
+
+def _metadata_row(metadata: FileMetadata) -> tuple:
+    return (
+        str(metadata.path),
+        metadata.hash,
+        metadata.signature,
+        metadata.file_size,
+        metadata.last_modified.isoformat(),
     )
 
 
+def save_file_metadata(conn: sqlite3.Connection, metadata: FileMetadata):
+    # Insert the metadata into the database or update if a conflict on 'path' occurs
+    conn.execute(SAVE_FILE_METADATA_QUERY, _metadata_row(metadata))
+
+
+def save_file_metadata_batch(conn: sqlite3.Connection, metadata: Iterable[FileMetadata]):
+    # executemany consumes the iterable lazily and the write transaction stays open until it is exhausted,
+    # don't pass a generator that does slow work (e.g. hashing) between rows
+    conn.executemany(SAVE_FILE_METADATA_QUERY, (_metadata_row(m) for m in metadata))
+
+
 def delete_file_metadata(conn: sqlite3.Connection, path: str):
     cur = conn.execute("DELETE FROM file_metadata WHERE path = ?", (path,))
     # get number of changes
@@ -67,23 +106,30 @@ def get_all_metadata(conn: sqlite3.Connection, path_like: Optional[str] = None)
     if path_like:
         if "%" in path_like:
             raise ValueError("we don't support % in paths")
-        path_like = path_like + "%"
-        escaped_path = path_like.replace("_", "\\_")
-        query += " WHERE path LIKE ? ESCAPE '\\' "
-        params = (escaped_path,)
+        # prefix match as a range on the (unique, indexed) path column,
+        # unlike `LIKE 'prefix%'` this is an index search instead of a full table scan
+        query += " WHERE path >= ? AND path < ?"
+        params = (path_like, _prefix_upper_bound(path_like))
 
     cursor = conn.execute(query, params)
     # would be nice to paginate
-    return [
-        FileMetadata(
-            path=row[1],
-            hash=row[2],
-            signature=row[3],
-            file_size=row[4],
-            last_modified=row[5],
-        )
-        for row in cursor
-    ]
+    return [_row_to_metadata(row) for row in cursor]
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string that starts with `prefix`"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def get_metadata_batch(conn: sqlite3.Connection, paths: list[str]) -> list[FileMetadata]:
+    """Get the metadata of all `paths` that exist, with one query per MAX_QUERY_PARAMS paths"""
+    metadata = []
+    for i in range(0, len(paths), MAX_QUERY_PARAMS):
+        batch = paths[i : i + MAX_QUERY_PARAMS]
+        placeholders = ", ".join("?" * len(batch))
+        cursor = conn.execute(f"SELECT * FROM file_metadata WHERE path IN ({placeholders})", batch)
+        metadata.extend(_row_to_metadata(row) for row in cursor)
+    return metadata
 
 
 def get_one_metadata(conn: sqlite3.Connection, path: str) -> FileMetadata:
@@ -91,7 +137,10 @@ def get_one_metadata(conn: sqlite3.Connection, path: str) -> FileMetadata:
     rows = cursor.fetchall()
     if len(rows) == 0 or len(rows) > 1:
         raise ValueError(f"Expected 1 metadata entry for {path}, got {len(rows)}")
-    row = rows[0]
+    return _row_to_metadata(rows[0])
+
+
+def _row_to_metadata(row: tuple) -> FileMetadata:
     return FileMetadata(
         path=row[1],
         hash=row[2],
@@ -108,7 +157,7 @@ def get_all_datasites(conn: sqlite3.Connection) -> list[str]:
         FROM file_metadata;
         """
     )
-    return [row[0] for row in cursor if row[0]]
+    return [sys.intern(row[0]) for row in cursor if row[0]]
 
 
 def move_with_transaction(
@@ -1,3 +1,5 @@
+import os
+import uuid
 from pathlib import Path
 
 from pydantic import BaseModel
@@ -5,7 +7,7 @@ from pydantic import BaseModel
 from syftbox.server.settings import ServerSettings
 from syftbox.server.sync import db
 from syftbox.server.sync.db import get_db
-from syftbox.server.sync.hash import hash_file
+from syftbox.server.sync.hash import hash_bytes
 from syftbox.server.sync.models import AbsolutePath, FileMetadata, RelativePath
 
 
@@ -25,15 +27,16 @@ class FileStore:
 
     def delete(self, path: RelativePath) -> None:
         conn = get_db(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("BEGIN IMMEDIATE;")
-        try:
-            db.delete_file_metadata(cursor, str(path))
-        except ValueError:
-            pass
-        abs_path = self.server_settings.snapshot_folder / path
-        abs_path.unlink(missing_ok=True)
-        conn.commit()
+        # the connection is reused, `with conn` rolls back if anything fails mid-transaction
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                db.delete_file_metadata(cursor, str(path))
+            except ValueError:
+                pass
+            abs_path = self.server_settings.snapshot_folder / path
+            abs_path.unlink(missing_ok=True)
         cursor.close()
 
     def get(self, path: RelativePath) -> SyftFile:
@@ -46,6 +49,16 @@ class FileStore:
                 raise ValueError("File not found")
             return SyftFile(metadata=metadata, data=self._read_bytes(abs_path), absolute_path=abs_path)
 
+    def get_absolute_path(self, path: RelativePath) -> AbsolutePath:
+        """Like `get`, without reading the file, for callers that stream it from disk themselves"""
+        with get_db(self.db_path) as conn:
+            metadata = db.get_one_metadata(conn, path=str(path))
+        abs_path = self.server_settings.snapshot_folder / metadata.path
+        if not Path(abs_path).exists():
+            self.delete(metadata.path.as_posix())
+            raise ValueError("File not found")
+        return abs_path
+
     def exists(self, path: RelativePath) -> bool:
         with get_db(self.db_path) as conn:
             try:
@@ -59,23 +72,42 @@ class FileStore:
             metadata = db.get_one_metadata(conn, path=str(path))
             return metadata
 
+    def get_metadata_batch(self, paths: list[RelativePath]) -> list[FileMetadata]:
+        conn = get_db(self.db_path)
+        return db.get_metadata_batch(conn, paths=[str(path) for path in paths])
+
     def _read_bytes(self, path: AbsolutePath) -> bytes:
-        with open(path, "rb") as f:
+        # whole-file read: unbuffered readall() sizes the result from fstat and skips the 8KB read buffer
+        with open(path, "rb", buffering=0) as f:
             return f.read()
 
     def put(self, path: Path, contents: bytes) -> None:
         abs_path = self.server_settings.snapshot_folder / path
         abs_path.parent.mkdir(exist_ok=True, parents=True)
+        self.server_settings.tmp_folder.mkdir(exist_ok=True, parents=True)
 
         conn = get_db(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("BEGIN IMMEDIATE;")
-        abs_path.write_bytes(contents)
-        metadata = hash_file(abs_path, root_dir=self.server_settings.snapshot_folder)
-        db.save_file_metadata(cursor, metadata)
-        conn.commit()
+        # the connection is reused, `with conn` rolls back if anything fails mid-transaction
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            # write to the tmp folder and rename over the target, readers never see a half-written file
+            # (unique name per put, and unlike mkstemp it keeps the default, umask based file mode).
+            # The tmp folder is outside the snapshot, a crash never leaves a temporary file in a datasite
+            tmp_path = self.server_settings.tmp_folder / f"{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "xb") as f:
+                    f.write(contents)
+                    f.flush()
+                    # stat the open handle instead of re-opening and re-reading the file we just wrote
+                    mtime = os.fstat(f.fileno()).st_mtime
+                metadata = hash_bytes(contents, path=Path(path), mtime=mtime)
+                db.save_file_metadata(cursor, metadata)
+                os.replace(tmp_path, abs_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
         cursor.close()
-        conn.close()
 
     def list(self, path: RelativePath) -> list[FileMetadata]:
         with get_db(self.db_path) as conn:
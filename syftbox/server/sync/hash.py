@@ -1,29 +1,50 @@
 import base64
 import hashlib
+import os
 import re
-from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from functools import partial
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 from loguru import logger
 from py_fast_rsync import signature
 
+from syftbox.lib.cache import LRUCache, is_recently_modified
 from syftbox.lib.ignore import filter_ignored_paths
 from syftbox.server.sync.models import FileMetadata
 
+MAX_HASH_FILE_SIZE = 100_000_000
+HASH_PARALLEL_THRESHOLD = 8
+HASH_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+HASH_MAX_PENDING = HASH_MAX_WORKERS * 4
+HASH_CACHE_SIZE = 100_000
+
+# (path, root_dir, size, mtime_ns, ctime_ns, inode) -> FileMetadata, shared by all hash_dir calls
+_hash_cache: LRUCache[tuple, FileMetadata] = LRUCache(maxsize=HASH_CACHE_SIZE)
+
 
 def hash_file(file_path: Path, root_dir: Optional[Path] = None) -> Optional[FileMetadata]:
     # ignore files larger then 100MB
     try:
-        if file_path.stat().st_size > 100_000_000:
-            logger.warning("File too large: %s", file_path)
-            return str(file_path), None
-
-        with open(file_path, "rb") as f:
+        # stat once, size and mtime come from the same call
+        stat = file_path.stat()
+        if stat.st_size > MAX_HASH_FILE_SIZE:
+            logger.warning(f"File too large: {file_path}")
+            return None
+
+        # unchanged files (same size, mtime, ctime and inode) don't need to be read and hashed again
+        cache_key = (str(file_path), str(root_dir), stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino)
+        metadata = _hash_cache.get(cache_key)
+        if metadata is not None:
+            return metadata
+
+        # unbuffered, readall() sizes its buffer from fstat and reads the file in one go
+        with open(file_path, "rb", buffering=0) as f:
             # not ideal for large files
             # but py_fast_rsync does not support files yet.
+            # sha256 could be streamed, but the rsync signature needs the whole file as bytes anyway
             # TODO: add support for streaming hashing
             data = f.read()
 
@@ -31,22 +52,55 @@ def hash_file(file_path: Path, root_dir: Optional[Path] = None) -> Optional[File
             path = file_path
         else:
             path = file_path.relative_to(root_dir)
-        return FileMetadata(
-            path=path,
-            hash=hashlib.sha256(data).hexdigest(),
-            signature=base64.b85encode(signature.calculate(data)),
-            file_size=len(data),
-            last_modified=datetime.fromtimestamp(file_path.stat().st_mtime, timezone.utc),
-        )
+        metadata = hash_bytes(data, path=path, mtime=stat.st_mtime)
+        # a recently modified file can still change without changing its stat
+        if not is_recently_modified(stat):
+            _hash_cache.set(cache_key, metadata)
+        return metadata
     except Exception:
         logger.error(f"Failed to hash file {file_path}")
         return None
 
 
+def sha256_hexdigest(data: bytes) -> str:
+    # file hashes are for content addressing, not security. On FIPS/policy restricted
+    # OpenSSL builds this lets hashlib pick the fastest (e.g. SHA-NI) implementation
+    return hashlib.sha256(data, usedforsecurity=False).hexdigest()
+
+
+def hash_bytes(data: bytes, path: Path, mtime: float) -> FileMetadata:
+    """Build the FileMetadata for `data`, for callers that already hold the file contents in memory"""
+    return FileMetadata(
+        path=path,
+        hash=sha256_hexdigest(data),
+        signature=base64.b85encode(signature.calculate(data)),
+        file_size=len(data),
+        last_modified=datetime.fromtimestamp(mtime, timezone.utc),
+    )
+
+
+def iter_hash_files_parallel(files: list[Path], root_dir: Path) -> Iterator[FileMetadata]:
+    # threads instead of processes: file reads and sha256 release the GIL,
+    # and nothing (paths, file contents, metadata) has to be pickled between processes.
+    # Unlike executor.map, at most HASH_MAX_PENDING files are submitted ahead of the consumer,
+    # so memory stays bounded when the results are consumed slower than they are hashed
+    with ThreadPoolExecutor(max_workers=HASH_MAX_WORKERS) as executor:
+        pending: deque[Future[Optional[FileMetadata]]] = deque()
+        for file in files:
+            if len(pending) >= HASH_MAX_PENDING:
+                metadata = pending.popleft().result()
+                if metadata is not None:
+                    yield metadata
+            pending.append(executor.submit(hash_file, file, root_dir))
+
+        while pending:
+            metadata = pending.popleft().result()
+            if metadata is not None:
+                yield metadata
+
+
 def hash_files_parallel(files: list[Path], root_dir: Path) -> list[FileMetadata]:
-    with ProcessPoolExecutor() as executor:
-        results = list(executor.map(partial(hash_file, root_dir=root_dir), files))
-    return [r for r in results if r is not None]
+    return list(iter_hash_files_parallel(files, root_dir))
 
 
 def hash_files(files: list[Path], root_dir: Path) -> list[FileMetadata]:
@@ -67,14 +121,29 @@ def hash_dir(
     """
     files = collect_files(dir)
 
-    relative_paths = [file.relative_to(root_dir) for file in files]
+    # keep the absolute paths around, so they don't have to be joined again for hashing
+    root_prefix = str(root_dir) + os.sep
+    abs_by_relative = {_relative_path(file, root_dir, root_prefix): file for file in files}
+    relative_paths = list(abs_by_relative)
     if filter_ignored:
         relative_paths = filter_ignored_paths(root_dir, relative_paths)
 
-    absolute_paths = [root_dir / file for file in relative_paths]
+    absolute_paths = [abs_by_relative[file] for file in relative_paths]
+    if len(absolute_paths) > HASH_PARALLEL_THRESHOLD:
+        return hash_files_parallel(absolute_paths, root_dir)
     return hash_files(absolute_paths, root_dir)
 
 
+def _relative_path(file: Path, root_dir: Path, root_prefix: str) -> Path:
+    # slicing the root_dir prefix off is much cheaper than Path.relative_to. Files that are not
+    # textually below root_dir (e.g. a resolved symlink under an unresolved root_dir) go through
+    # relative_to, which raises instead of silently returning a wrong path
+    file_str = str(file)
+    if file_str.startswith(root_prefix):
+        return Path(file_str[len(root_prefix) :])
+    return file.relative_to(root_dir)
+
+
 def collect_files(
     dir: Union[Path, str],
     pattern: Union[str, re.Pattern, None] = None,
@@ -84,17 +153,28 @@ def collect_files(
     dir = Path(dir)
     if not dir.is_dir():
         return []
-    files = []
 
     # Compile the regex pattern if it's a string
     if isinstance(pattern, str):
         pattern = re.compile(pattern)
 
-    for entry in dir.iterdir():
-        if entry.is_file():
-            if pattern is None or pattern.match(entry.as_posix()):
-                files.append(entry)
-        elif entry.is_dir():
-            files.extend(collect_files(entry, pattern))
-
+    files = []
+    _collect_files(str(dir), pattern, files)
     return files
+
+
+def _as_posix(path: str) -> str:
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+
+def _collect_files(dir: str, pattern: Optional[re.Pattern], files: list[Path]) -> None:
+    # os.scandir returns the entry type with the listing, so is_file/is_dir
+    # don't need an extra stat per entry (except for symlinks, which are followed)
+    with os.scandir(dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                # match on the plain str path, only files that are returned become Path objects
+                if pattern is None or pattern.match(_as_posix(entry.path)):
+                    files.append(Path(entry.path))
+            elif entry.is_dir():
+                _collect_files(entry.path, pattern, files)
@@ -43,6 +43,14 @@ class DiffResponse(BaseModel):
         return base64.b85decode(self.diff)
 
 
+class RawDiffResponse(BaseModel):
+    """DiffResponse counterpart for clients that request the diff as raw bytes (no base85 round-trip)"""
+
+    path: RelativePath
+    diff_bytes: bytes
+    hash: str
+
+
 class SignatureError(str, enum.Enum):
     FILE_NOT_FOUND = "FILE_NOT_FOUND"
     FILE_NOT_WRITEABLE = "FILE_NOT_WRITEABLE"
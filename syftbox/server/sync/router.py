@@ -1,22 +1,26 @@
 import base64
 import hashlib
-import sqlite3
 import zipfile
-from io import BytesIO
+from pathlib import Path
+from typing import Iterator
 
 import py_fast_rsync
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile
 from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
 
+from syftbox.lib.cache import LRUCache
 from syftbox.lib.lib import PermissionTree, SyftPermission, filter_metadata
 from syftbox.server.analytics import log_analytics_event, log_file_change_event
 from syftbox.server.settings import ServerSettings, get_server_settings
+from syftbox.server.sync.constants import DIFF_HASH_HEADER, DIFF_MEDIA_TYPE
 from syftbox.server.sync.db import (
     get_all_datasites,
     get_db,
 )
-from syftbox.server.sync.file_store import FileStore, SyftFile
+from syftbox.server.sync.file_store import FileStore
+from syftbox.server.sync.hash import sha256_hexdigest
 from syftbox.server.users.auth import get_current_user
 
 from .models import (
@@ -32,12 +36,6 @@ from .models import (
 )
 
 
-def get_db_connection(request: Request):
-    conn = get_db(request.state.server_settings.file_db_path)
-    yield conn
-    conn.close()
-
-
 def get_file_store(request: Request):
     store = FileStore(
         server_settings=request.state.server_settings,
@@ -48,33 +46,70 @@ def get_file_store(request: Request):
 router = APIRouter(prefix="/sync", tags=["sync"])
 
 
+DIFF_CACHE_SIZE = 1024
+DIFF_CACHE_MAX_DIFF_SIZE = 1_000_000
+
+# (path, file hash, signature digest) -> diff. Clients on the same version of a file send the same
+# signature, so they all get the same diff
+_diff_cache: LRUCache[tuple, bytes] = LRUCache(maxsize=DIFF_CACHE_SIZE)
+
+
+def _diff_cache_key(path: Path, file_hash: str, signature: bytes) -> tuple:
+    return (path.as_posix(), file_hash, hashlib.blake2b(signature, digest_size=16).digest())
+
+
+def _set_cached_diff(key: tuple, diff: bytes) -> None:
+    if len(diff) <= DIFF_CACHE_MAX_DIFF_SIZE:
+        _diff_cache.set(key, diff)
+
+
 @router.post("/get_diff", response_model=DiffResponse)
 def get_diff(
     req: DiffRequest,
+    request: Request,
     file_store: FileStore = Depends(get_file_store),
     email: str = Depends(get_current_user),
 ) -> DiffResponse:
+    signature = req.signature_bytes
     try:
-        file = file_store.get(req.path)
+        metadata = file_store.get_metadata(req.path)
     except ValueError:
         raise HTTPException(status_code=404, detail="file not found")
-    diff = py_fast_rsync.diff(req.signature_bytes, file.data)
+
+    # the metadata is enough to find a cached diff, the file is only read on a miss
+    diff = _diff_cache.get(_diff_cache_key(metadata.path, metadata.hash, signature))
+    if diff is None:
+        try:
+            file = file_store.get(req.path)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="file not found")
+        metadata = file.metadata
+        diff = py_fast_rsync.diff(signature, file.data)
+        # FileStore.put replaces the file before it commits the new metadata, a get racing with it can read
+        # the new bytes with the old hash. Only cache diffs of bytes that match the hash they're cached under
+        if sha256_hexdigest(file.data) == metadata.hash:
+            _set_cached_diff(_diff_cache_key(metadata.path, metadata.hash, signature), diff)
+
+    # newer clients ask for the raw diff, skipping the base85 encode and the JSON wrapping
+    if DIFF_MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(content=diff, media_type=DIFF_MEDIA_TYPE, headers={DIFF_HASH_HEADER: metadata.hash})
+
     diff_bytes = base64.b85encode(diff).decode("utf-8")
     return DiffResponse(
-        path=file.metadata.path.as_posix(),
+        path=metadata.path.as_posix(),
         diff=diff_bytes,
-        hash=file.metadata.hash,
+        hash=metadata.hash,
     )
 
 
 @router.post("/datasite_states", response_model=dict[str, list[FileMetadata]])
 def get_datasite_states(
-    conn: sqlite3.Connection = Depends(get_db_connection),
     file_store: FileStore = Depends(get_file_store),
     server_settings: ServerSettings = Depends(get_server_settings),
     email: str = Depends(get_current_user),
 ) -> dict[str, list[FileMetadata]]:
-    all_datasites = get_all_datasites(conn)
+    # get_db connections are per thread, the endpoint can run on a different thread than its dependencies
+    all_datasites = get_all_datasites(get_db(server_settings.file_db_path))
     datasite_states: dict[str, list[FileMetadata]] = {}
     for datasite in all_datasites:
         try:
@@ -87,6 +122,29 @@ def get_datasite_states(
     return datasite_states
 
 
+PERM_TREE_CACHE_SIZE = 1024
+
+# dir -> (permission files signature, PermissionTree)
+_perm_tree_cache: LRUCache[str, tuple[tuple, PermissionTree]] = LRUCache(maxsize=PERM_TREE_CACHE_SIZE)
+
+
+def _get_perm_tree(full_path: Path, metadata_list: list[FileMetadata]) -> PermissionTree:
+    """
+    PermissionTree.from_path walks the whole dir and reads every permission file. All writes go through
+    the FileStore, so the (path, hash) of the permission files in the metadata db tell if a cached tree
+    for this dir is still valid.
+    """
+    perm_signature = tuple((m.path, m.hash) for m in metadata_list if m.path.name.endswith(".syftperm"))
+    key = str(full_path)
+    cached = _perm_tree_cache.get(key)
+    if cached is not None and cached[0] == perm_signature:
+        return cached[1]
+
+    perm_tree = PermissionTree.from_path(full_path, raise_on_corrupted_files=True)
+    _perm_tree_cache.set(key, (perm_signature, perm_tree))
+    return perm_tree
+
+
 @router.post("/dir_state", response_model=list[FileMetadata])
 def dir_state(
     dir: RelativePath,
@@ -95,14 +153,14 @@ def dir_state(
     email: str = Depends(get_current_user),
 ) -> list[FileMetadata]:
     full_path = server_settings.snapshot_folder / dir
+    metadata_list = file_store.list(dir)
     # get the top level perm file
     try:
-        perm_tree = PermissionTree.from_path(full_path, raise_on_corrupted_files=True)
+        perm_tree = _get_perm_tree(full_path, metadata_list)
     except ValueError:
         raise HTTPException(status_code=500, detail=f"Failed to parse permission tree: {dir}")
 
     # filter the read state for this user by the perm tree
-    metadata_list = file_store.list(dir)
     filtered_metadata = filter_metadata(email, metadata_list, perm_tree, server_settings.snapshot_folder)
     return filtered_metadata
 
@@ -125,6 +183,22 @@ def get_metadata(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/get_metadata_batch", response_model=list[FileMetadata])
+def get_metadata_batch(
+    req: BatchFileRequest,
+    file_store: FileStore = Depends(get_file_store),
+    email: str = Depends(get_current_user),
+) -> list[FileMetadata]:
+    """Get the metadata of many files in one call, paths that don't exist are left out of the result."""
+    metadata = file_store.get_metadata_batch(req.paths)
+    log_analytics_event(
+        "/sync/get_metadata_batch",
+        email=email,
+        num_paths=len(req.paths),
+    )
+    return metadata
+
+
 @router.post("/apply_diff", response_model=ApplyDiffResponse)
 def apply_diffs(
     req: ApplyDiffRequest,
@@ -137,7 +211,7 @@ def apply_diffs(
         raise HTTPException(status_code=404, detail="file not found")
 
     result = py_fast_rsync.apply(file.data, req.diff_bytes)
-    new_hash = hashlib.sha256(result).hexdigest()
+    new_hash = sha256_hexdigest(result)
 
     if new_hash != req.expected_hash:
         raise HTTPException(status_code=400, detail="hash mismatch, skipped writing")
@@ -213,7 +287,8 @@ def download_file(
     email: str = Depends(get_current_user),
 ) -> FileResponse:
     try:
-        abs_path = file_store.get(req.path).absolute_path
+        # only the path is needed, FileResponse streams the file from disk
+        abs_path = file_store.get_absolute_path(req.path)
         return FileResponse(abs_path)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -221,19 +296,67 @@ def download_file(
 
 @router.post("/datasites", response_model=list[str])
 def get_datasites(
-    conn: sqlite3.Connection = Depends(get_db_connection),
+    server_settings: ServerSettings = Depends(get_server_settings),
     email: str = Depends(get_current_user),
 ) -> list[str]:
-    return get_all_datasites(conn)
+    # get_db connections are per thread, the endpoint can run on a different thread than its dependencies
+    return get_all_datasites(get_db(server_settings.file_db_path))
+
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipChunkBuffer:
+    """Write-only, unseekable sink for ZipFile. zipfile writes data descriptors instead of seeking back,
+    so everything written can be handed to the client as soon as it is drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
 
+    def flush(self) -> None:
+        pass
 
-def create_zip_from_files(files: list[SyftFile]) -> BytesIO:
-    memory_file = BytesIO()
-    with zipfile.ZipFile(memory_file, "w") as zf:
-        for file in files:
-            zf.writestr(file.metadata.path.as_posix(), file.data)
-    memory_file.seek(0)
-    return memory_file
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+def iter_zip(files: list[tuple[str, Path]]) -> Iterator[bytes]:
+    """Zip (arcname, absolute path) pairs, yielding the archive in chunks while it is being written.
+    Files are copied in ZIP_CHUNK_SIZE pieces, so memory use doesn't grow with the file sizes."""
+    buffer = _ZipChunkBuffer()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for arcname, abs_path in files:
+            try:
+                src = open(abs_path, "rb")
+            except OSError:
+                logger.warning(f"File not found: {arcname}")
+                continue
+            with src, zf.open(zipfile.ZipInfo.from_file(abs_path, arcname), "w") as dst:
+                while chunk := src.read(ZIP_CHUNK_SIZE):
+                    dst.write(chunk)
+                    yield from buffer.drain()
+            yield from buffer.drain()
+    # central directory
+    yield from buffer.drain()
+
+
+def _get_zip_members(file_store: FileStore, paths: list[RelativePath]) -> list[tuple[str, Path]]:
+    # one IN query for all paths, then walk the request to keep its order and report missing files
+    metadata_by_path = {metadata.path: metadata for metadata in file_store.get_metadata_batch(paths)}
+    all_files = []
+    for path in paths:
+        metadata = metadata_by_path.get(path)
+        if metadata is None:
+            logger.warning(f"File not found: {path}")
+            continue
+        arcname = metadata.path.as_posix()
+        all_files.append((arcname, file_store.server_settings.snapshot_folder / arcname))
+    return all_files
 
 
 @router.post("/download_bulk")
@@ -242,13 +365,7 @@ async def get_files(
     file_store: FileStore = Depends(get_file_store),
     email: str = Depends(get_current_user),
 ) -> StreamingResponse:
-    all_files = []
-    for path in req.paths:
-        try:
-            file = file_store.get(path)
-        except ValueError:
-            logger.warning(f"File not found: {path}")
-            continue
-        all_files.append(file)
-    zip_file = create_zip_from_files(all_files)
-    return Response(content=zip_file.read(), media_type="application/zip")
+    # the db lookups block, keep them off the event loop
+    all_files = await run_in_threadpool(_get_zip_members, file_store, req.paths)
+    # sync generator, starlette iterates it in a threadpool so the file reads don't block the event loop
+    return StreamingResponse(iter_zip(all_files), media_type="application/zip")
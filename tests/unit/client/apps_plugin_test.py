@@ -0,0 +1,45 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from syftbox.client.plugins import apps
+from syftbox.client.plugins.apps import get_file_hash, output_published
+
+
+@pytest.fixture(params=[True, False], ids=["file_digest", "readinto"])
+def file_digest(request, monkeypatch):
+    # python < 3.11 has no hashlib.file_digest, exercise the fallback on every interpreter
+    if not request.param:
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    # a small buffer so the fallback loops over multiple reads
+    monkeypatch.setattr(apps, "HASH_BUFFER_SIZE", 4)
+
+
+def test_get_file_hash(tmp_path: Path, file_digest):
+    file_path = tmp_path / "output.txt"
+    file_path.write_bytes(b"Hello, World!")
+
+    assert get_file_hash(file_path) == hashlib.sha256(b"Hello, World!").hexdigest()
+    assert get_file_hash(file_path, digest="md5") == hashlib.md5(b"Hello, World!").hexdigest()
+
+
+def test_output_published(tmp_path: Path, file_digest):
+    app_output = tmp_path / "app_output.txt"
+    published_output = tmp_path / "published_output.txt"
+    app_output.write_bytes(b"Hello, World!")
+
+    # missing file
+    assert not output_published(app_output, published_output)
+
+    # equal
+    published_output.write_bytes(b"Hello, World!")
+    assert output_published(app_output, published_output)
+
+    # different size
+    published_output.write_bytes(b"Hello!")
+    assert not output_published(app_output, published_output)
+
+    # same size, different content
+    published_output.write_bytes(b"Hello, Earth!")
+    assert not output_published(app_output, published_output)
@@ -0,0 +1,24 @@
+from syftbox.lib.cache import LRUCache
+
+
+def test_lru_cache():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("missing") is None
+
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    # overwriting an entry does not evict another one
+    cache.set("a", 4)
+    assert cache.get("a") == 4
+    assert cache.get("c") == 3
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from syftbox.lib.lib import FileMetadata, PermissionTree, SyftPermission, filter_metadata
+
+
+def _metadata(path: str) -> FileMetadata:
+    return FileMetadata(
+        path=Path(path),
+        hash="",
+        signature=b"",
+        file_size=0,
+        last_modified="2024-01-01T00:00:00+00:00",
+    )
+
+
+def test_filter_metadata_per_directory(tmp_path: Path):
+    owner = "owner@openmined.org"
+    user = "user@openmined.org"
+    datasite = tmp_path / owner
+    (datasite / "public").mkdir(parents=True)
+    (datasite / "private").mkdir(parents=True)
+    SyftPermission.datasite_default(owner).save(str(datasite))
+    SyftPermission.mine_with_public_read(owner).save(str(datasite / "public"))
+
+    paths = [f"{owner}/a.txt", f"{owner}/public/b.txt", f"{owner}/private/c.txt", f"{owner}/public/d.txt"]
+    metadata_list = [_metadata(path) for path in paths]
+    perm_tree = PermissionTree.from_path(str(datasite))
+
+    allowed = filter_metadata(user, metadata_list, perm_tree, tmp_path)
+    assert [m.path.as_posix() for m in allowed] == [f"{owner}/public/b.txt", f"{owner}/public/d.txt"]
+    assert filter_metadata(owner, metadata_list, perm_tree, tmp_path) == metadata_list
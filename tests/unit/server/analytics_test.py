@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+from syftbox.server.analytics import to_jsonable_dict
+from syftbox.server.sync.models import FileMetadata
+
+
+def test_to_jsonable_dict():
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    metadata = FileMetadata(
+        path=Path("a/b.txt"),
+        hash="abc",
+        signature=b"sig",
+        file_size=3,
+        last_modified=timestamp,
+    )
+    obj = {
+        "str": "value",
+        "int": 1,
+        "bool": True,
+        "none": None,
+        "timestamp": timestamp,
+        "path": Path("a/b.txt"),
+        "nested": {"path": Path("c/d.txt"), "metadata": metadata},
+        "other": [1, 2],
+    }
+
+    assert to_jsonable_dict(obj) == {
+        "str": "value",
+        "int": 1,
+        "bool": True,
+        "none": None,
+        "timestamp": timestamp.isoformat(),
+        "path": "a/b.txt",
+        "nested": {"path": "c/d.txt", "metadata": metadata.model_dump(mode="json")},
+        "other": "[1, 2]",
+    }
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from syftbox.server.settings import ServerSettings
+from tests.unit.server.conftest import TEST_DATASITE_NAME
+
+
+def test_browse_public_files(client: TestClient):
+    public_dir = ServerSettings().snapshot_folder / TEST_DATASITE_NAME / "public"
+    public_dir.mkdir(parents=True)
+    (public_dir / "README.md").write_text("# Hello")
+    (public_dir / "index.html").write_text("<h1>Hello</h1>")
+
+    response = client.get(f"/datasites/{TEST_DATASITE_NAME}/README.md")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text == "# Hello"
+
+    response = client.get(f"/datasites/{TEST_DATASITE_NAME}/")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.text == "<h1>Hello</h1>"
@@ -1,10 +1,18 @@
+import sqlite3
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pytest
+
+from syftbox.server import server
+from syftbox.server.server import init_db
 from syftbox.server.settings import ServerSettings
+from syftbox.server.sync import hash
+from syftbox.server.sync.db import get_db
 from syftbox.server.sync.file_store import FileStore
 from syftbox.server.sync.hash import hash_file
+from syftbox.server.sync.models import FileMetadata
 
 
 def test_put_atomic(tmpdir):
@@ -18,3 +26,102 @@ def test_put_atomic(tmpdir):
     assert system_path.exists()
     metadata = FileStore(settings).get_metadata(syft_path)
     assert metadata.hash_bytes == hash_file(system_path).hash_bytes
+
+
+def test_db_connection_per_thread(tmpdir):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    conn = get_db(settings.file_db_path)
+    assert get_db(settings.file_db_path) is conn
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_conn = executor.submit(get_db, settings.file_db_path).result()
+    assert other_conn is not conn
+
+
+def test_put_after_failed_put(tmpdir):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    store = FileStore(settings)
+    syft_path = Path("test.txt")
+
+    with pytest.raises(TypeError):
+        store.put(syft_path, "not bytes")
+
+    # the reused connection must not be left inside the failed transaction
+    store.put(syft_path, b"Hello, World!")
+    assert store.get(syft_path).data == b"Hello, World!"
+    # no temporary files are left behind, neither by the failed nor by the successful put
+    assert [p.name for p in settings.snapshot_folder.iterdir()] == ["test.txt"]
+    assert list(settings.tmp_folder.iterdir()) == []
+
+
+def test_list_prefix(tmpdir):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    store = FileStore(settings)
+    paths = ["user@openmined.org/a.txt", "user@openmined.org/dir/b_1.txt", "user2@openmined.org/c.txt", "other/d.txt"]
+    for path in paths:
+        store.put(Path(path), b"data")
+
+    assert sorted(m.path.as_posix() for m in store.list(Path("user@openmined.org/"))) == [
+        "user@openmined.org/a.txt",
+        "user@openmined.org/dir/b_1.txt",
+    ]
+    # `_` is not a wildcard
+    assert [m.path.as_posix() for m in store.list(Path("user@openmined.org/dir/b_"))] == [
+        "user@openmined.org/dir/b_1.txt"
+    ]
+    assert store.list(Path("user@openmined.org/dir/bx")) == []
+    assert len(store.list(Path("user"))) == 3
+
+
+def test_metadata_roundtrip(tmpdir):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    store = FileStore(settings)
+    syft_path = Path("user@openmined.org/test.txt")
+    store.put(syft_path, b"Hello, World!")
+
+    metadata = store.get_metadata(syft_path)
+    expected = hash_file(settings.snapshot_folder / syft_path, root_dir=settings.snapshot_folder)
+    assert isinstance(metadata.path, Path)
+    assert metadata.path == syft_path
+    assert metadata.hash == expected.hash
+    assert metadata.signature == expected.signature
+    assert metadata.file_size == expected.file_size
+    assert metadata.last_modified == expected.last_modified
+    assert metadata.model_dump() == FileMetadata.model_validate(metadata.model_dump()).model_dump()
+
+
+def test_init_db_does_not_lock_db_while_hashing(tmpdir, monkeypatch):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    settings.snapshot_folder.mkdir(parents=True)
+    for i in range(5):
+        (settings.snapshot_folder / f"file_{i}.txt").write_bytes(f"data {i}".encode())
+
+    iter_hash_files_parallel = hash.iter_hash_files_parallel
+
+    def iter_hash_and_write(files, root_dir):
+        for metadata in iter_hash_files_parallel(files, root_dir):
+            # another connection can write between hashes, no write transaction is held while hashing
+            with sqlite3.connect(settings.file_db_path, timeout=0) as conn:
+                conn.execute("INSERT OR REPLACE INTO file_metadata VALUES (1000, 'other.txt', '', '', 0, '')")
+            yield metadata
+
+    monkeypatch.setattr(server, "INIT_DB_BATCH_SIZE", 2)
+    monkeypatch.setattr(hash, "iter_hash_files_parallel", iter_hash_and_write)
+    init_db(settings)
+
+    paths = {m.path.as_posix() for m in FileStore(settings).list(Path("file_"))}
+    assert paths == {f"file_{i}.txt" for i in range(5)}
+
+
+def test_init_db_removes_leftover_tmp_files(tmpdir):
+    settings = ServerSettings.from_data_folder(tmpdir)
+    store = FileStore(settings)
+    store.put(Path("user@openmined.org/test.txt"), b"Hello, World!")
+
+    # a put that was interrupted before its file was moved into the snapshot
+    leftover = settings.tmp_folder / f"{uuid.uuid4().hex}.tmp"
+    leftover.write_bytes(b"partial")
+
+    init_db(settings)
+    assert not leftover.exists()
+    assert [m.path.as_posix() for m in store.list(Path("user@openmined.org/"))] == ["user@openmined.org/test.txt"]
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from syftbox.lib.cache import MIN_MTIME_AGE
+from syftbox.server.sync import hash as hash_module
+from syftbox.server.sync.hash import collect_files, hash_dir, hash_file
+
+
+def test_hash_file(tmp_path: Path):
+    file_path = tmp_path / "a" / "file.txt"
+    file_path.parent.mkdir()
+    file_path.write_bytes(b"Hello, World!")
+
+    metadata = hash_file(file_path, root_dir=tmp_path)
+    assert metadata.path == Path("a/file.txt")
+    assert metadata.hash == hashlib.sha256(b"Hello, World!").hexdigest()
+    assert metadata.file_size == 13
+
+
+def test_hash_file_too_large(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(hash_module, "MAX_HASH_FILE_SIZE", 5)
+    file_path = tmp_path / "file.txt"
+    file_path.write_bytes(b"Hello, World!")
+
+    assert hash_file(file_path, root_dir=tmp_path) is None
+    assert hash_dir(tmp_path, root_dir=tmp_path) == []
+
+
+def test_hash_dir_parallel(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(hash_module, "HASH_PARALLEL_THRESHOLD", 2)
+    for i in range(10):
+        file_path = tmp_path / f"dir_{i % 3}" / f"file_{i}.txt"
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_text(f"file {i}")
+
+    metadata = hash_dir(tmp_path, root_dir=tmp_path)
+    assert sorted(m.path for m in metadata) == sorted(Path(f"dir_{i % 3}/file_{i}.txt") for i in range(10))
+    assert all(m.hash == hashlib.sha256(f"file {m.path.stem[5:]}".encode()).hexdigest() for m in metadata)
+
+
+def test_collect_files(tmp_path: Path):
+    for path in ["a.txt", "b.csv", "dir/c.txt", "dir/nested/d.txt"]:
+        file_path = tmp_path / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.touch()
+    (tmp_path / "empty_dir").mkdir()
+
+    files = collect_files(tmp_path)
+    assert sorted(files) == sorted(tmp_path / p for p in ["a.txt", "b.csv", "dir/c.txt", "dir/nested/d.txt"])
+
+    files = collect_files(tmp_path, pattern=r".*\.txt$")
+    assert sorted(files) == sorted(tmp_path / p for p in ["a.txt", "dir/c.txt", "dir/nested/d.txt"])
+
+    assert collect_files(tmp_path / "missing") == []
+
+
+def _set_mtime_in_past(file_path: Path) -> None:
+    mtime = time.time() - 60
+    os.utime(file_path, (mtime, mtime))
+
+
+def test_hash_file_cache(tmp_path: Path):
+    file_path = tmp_path / "file.txt"
+    file_path.write_bytes(b"Hello, World!")
+    _set_mtime_in_past(file_path)
+
+    metadata = hash_file(file_path, root_dir=tmp_path)
+    assert hash_file(file_path, root_dir=tmp_path) is metadata
+
+    # same size, different contents
+    file_path.write_bytes(b"Hello, Earth!")
+    _set_mtime_in_past(file_path)
+    new_metadata = hash_file(file_path, root_dir=tmp_path)
+    assert new_metadata is not metadata
+    assert new_metadata.hash == hashlib.sha256(b"Hello, Earth!").hexdigest()
+
+
+def test_hash_file_cache_skips_recent_files(tmp_path: Path):
+    file_path = tmp_path / "file.txt"
+    file_path.write_bytes(b"Hello, World!")
+
+    # the mtime might not change on the next write on filesystems with a coarse mtime resolution,
+    # recently modified files are hashed again every time
+    metadata = hash_file(file_path, root_dir=tmp_path)
+    assert time.time() - file_path.stat().st_mtime < MIN_MTIME_AGE
+    assert hash_file(file_path, root_dir=tmp_path) is not metadata
+
+    _set_mtime_in_past(file_path)
+    metadata = hash_file(file_path, root_dir=tmp_path)
+    assert hash_file(file_path, root_dir=tmp_path) is metadata
+
+
+def test_hash_dir_outside_root_dir(tmp_path: Path):
+    real_dir = tmp_path / "real"
+    real_dir.mkdir()
+    (real_dir / "file.txt").write_text("content")
+    link_dir = tmp_path / "link"
+    link_dir.symlink_to(real_dir, target_is_directory=True)
+
+    # symlinks are ignored by default, they are only hashed without the ignore filter
+    assert [m.path for m in hash_dir(link_dir, root_dir=link_dir, filter_ignored=False)] == [Path("file.txt")]
+    # resolved files are not below the unresolved root_dir, no relative path can be made for them
+    with pytest.raises(ValueError):
+        hash_dir(link_dir.resolve(), root_dir=link_dir, filter_ignored=False)
+
+
+def test_iter_hash_files_parallel_bounded(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(hash_module, "HASH_MAX_PENDING", 2)
+    files = []
+    for i in range(10):
+        file_path = tmp_path / f"file_{i}.txt"
+        file_path.write_text(f"file {i}")
+        files.append(file_path)
+
+    hashed = []
+    hash_file_orig = hash_module.hash_file
+
+    def hash_file_tracked(file_path, root_dir=None):
+        hashed.append(file_path)
+        return hash_file_orig(file_path, root_dir)
+
+    monkeypatch.setattr(hash_module, "hash_file", hash_file_tracked)
+
+    # files are only submitted as results are consumed, not all at once
+    results = hash_module.iter_hash_files_parallel(files, tmp_path)
+    first = next(results)
+    assert len(hashed) <= 3
+    assert [first.path] + [m.path for m in results] == [Path(f"file_{i}.txt") for i in range(10)]
@@ -0,0 +1,44 @@
+import os
+
+from typer.testing import CliRunner
+
+from syftbox.server.cli import app as server_cli
+from syftbox.server.server import DB_INITIALIZED_ENV
+from syftbox.server.settings import ServerSettings
+from syftbox.server.sync.db import get_all_metadata, get_db
+
+runner = CliRunner()
+
+
+def test_server_workers_init_db_once(monkeypatch, tmp_path):
+    settings = ServerSettings.from_data_folder(tmp_path)
+    monkeypatch.setenv("SYFTBOX_DATA_FOLDER", str(settings.data_folder))
+    monkeypatch.delenv(DB_INITIALIZED_ENV, raising=False)
+    settings.snapshot_folder.mkdir(parents=True)
+    (settings.snapshot_folder / "test.txt").write_bytes(b"Hello, World!")
+
+    calls = []
+
+    def mock_run(*args, **kwargs):
+        # the db is initialized before the workers start, and the workers are told to skip it
+        paths = [m.path.as_posix() for m in get_all_metadata(get_db(settings.file_db_path))]
+        calls.append((kwargs["workers"], os.environ.get(DB_INITIALIZED_ENV), paths))
+
+    monkeypatch.setattr("uvicorn.run", mock_run)
+
+    result = runner.invoke(server_cli, ["--workers", "2"])
+    # the cli sets it for its worker processes, don't leak it into other tests
+    os.environ.pop(DB_INITIALIZED_ENV, None)
+    assert result.exit_code == 0, result.output
+    assert calls == [(2, "1", ["test.txt"])]
+
+
+def test_server_single_worker_init_db_in_lifespan(monkeypatch, tmp_path):
+    monkeypatch.setenv("SYFTBOX_DATA_FOLDER", str(tmp_path))
+    monkeypatch.delenv(DB_INITIALIZED_ENV, raising=False)
+    monkeypatch.setattr("uvicorn.run", lambda *args, **kwargs: None)
+
+    result = runner.invoke(server_cli)
+    assert result.exit_code == 0, result.output
+    assert DB_INITIALIZED_ENV not in os.environ
+    assert not (tmp_path / "file.db").exists()
@@ -1,9 +1,11 @@
 import base64
 import hashlib
+import json
 import zipfile
 from io import BytesIO
 from pathlib import Path
 
+import httpx
 import py_fast_rsync
 import pytest
 from fastapi.testclient import TestClient
@@ -13,13 +15,17 @@ from syftbox.client.exceptions import SyftServerError
 from syftbox.client.plugins.sync.endpoints import (
     apply_diff,
     download_bulk,
+    download_to_file,
     get_datasite_states,
     get_diff,
     get_metadata,
+    get_metadata_batch,
     get_remote_state,
 )
 from syftbox.lib.lib import FileMetadata
+from syftbox.server.sync.file_store import FileStore
 from syftbox.server.sync.models import ApplyDiffResponse, DiffResponse
+from syftbox.server.sync.router import ZIP_CHUNK_SIZE, iter_zip
 from tests.unit.server.conftest import PERMFILE_FILE, TEST_DATASITE_NAME, TEST_FILE
 
 
@@ -105,6 +111,31 @@ def test_get_metadata(client: TestClient):
     assert isinstance(metadata.signature_bytes, bytes)
 
 
+def test_get_metadata_batch(client: TestClient):
+    paths = [
+        Path(TEST_DATASITE_NAME) / TEST_FILE,
+        Path(TEST_DATASITE_NAME) / PERMFILE_FILE,
+        Path(TEST_DATASITE_NAME) / "nonexistent_file.txt",
+    ]
+    metadata = get_metadata_batch(client, paths)
+
+    assert sorted(m.path for m in metadata) == sorted(paths[:2])
+    for m in metadata:
+        assert m == get_metadata(client, m.path)
+
+
+def test_get_metadata_batch_logs_analytics(client: TestClient, monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        "syftbox.server.sync.router.log_analytics_event",
+        lambda endpoint, email, **kwargs: events.append((endpoint, email, kwargs)),
+    )
+    paths = [Path(TEST_DATASITE_NAME) / TEST_FILE, Path(TEST_DATASITE_NAME) / "nonexistent_file.txt"]
+    get_metadata_batch(client, paths)
+
+    assert events == [("/sync/get_metadata_batch", TEST_DATASITE_NAME, {"num_paths": 2})]
+
+
 def test_apply_diff(client: TestClient):
     local_data = b"This is my local data"
 
@@ -140,7 +171,7 @@ def test_get_diff(client: TestClient):
     assert response.path == file_path
 
     # apply and check hash
-    new_data = py_fast_rsync.apply(local_data, base64.b85decode(response.diff))
+    new_data = py_fast_rsync.apply(local_data, response.diff_bytes)
     new_hash = hashlib.sha256(new_data).hexdigest()
 
     assert new_hash == response.hash
@@ -247,7 +278,135 @@ def test_download_snapshot(client: TestClient):
     assert len(zip_file.filelist) == 3
 
 
+def test_download_bulk_skips_missing(client: TestClient):
+    paths = [f"{TEST_DATASITE_NAME}/{TEST_FILE}", f"{TEST_DATASITE_NAME}/nonexistent_file.txt"]
+    data = download_bulk(client, paths)
+    zip_file = zipfile.ZipFile(BytesIO(data))
+    assert zip_file.namelist() == [f"{TEST_DATASITE_NAME}/{TEST_FILE}"]
+
+
+def test_iter_zip_streams_chunks(tmp_path: Path):
+    large = tmp_path / "large.bin"
+    large.write_bytes(b"a" * (ZIP_CHUNK_SIZE * 3 + 1))
+    small = tmp_path / "small.txt"
+    small.write_bytes(b"small")
+
+    chunks = list(iter_zip([("large.bin", large), ("missing.txt", tmp_path / "missing.txt"), ("small.txt", small)]))
+    assert len(chunks) > 3
+
+    zip_file = zipfile.ZipFile(BytesIO(b"".join(chunks)))
+    assert zip_file.namelist() == ["large.bin", "small.txt"]
+    assert zip_file.read("large.bin") == large.read_bytes()
+    assert zip_file.read("small.txt") == b"small"
+
+
+def test_download_to_file(client: TestClient, tmp_path: Path):
+    dest = tmp_path / "downloads" / TEST_FILE
+    download_to_file(client, Path(TEST_DATASITE_NAME) / TEST_FILE, dest)
+
+    server_settings = client.app_state["server_settings"]
+    assert dest.read_bytes() == server_settings.read(f"{TEST_DATASITE_NAME}/{TEST_FILE}")
+
+    with pytest.raises(SyftServerError):
+        download_to_file(client, Path(TEST_DATASITE_NAME) / "nonexistent_file.txt", tmp_path / "missing.txt")
+    assert not (tmp_path / "missing.txt").exists()
+
+
+def test_download_to_file_interrupted(client: TestClient, tmp_path: Path, monkeypatch):
+    dest = tmp_path / "downloads" / TEST_FILE
+    dest.parent.mkdir()
+    dest.write_bytes(b"previous")
+
+    def iter_bytes_interrupted(self, chunk_size=None):
+        yield b"Hello"
+        raise httpx.ReadError("connection lost")
+
+    monkeypatch.setattr(httpx.Response, "iter_bytes", iter_bytes_interrupted)
+    with pytest.raises(httpx.ReadError):
+        download_to_file(client, Path(TEST_DATASITE_NAME) / TEST_FILE, dest)
+
+    # the previous file is left as is, and the partial download is removed
+    assert dest.read_bytes() == b"previous"
+    assert [p.name for p in dest.parent.iterdir()] == [TEST_FILE]
+
+
 def test_whoami(client: TestClient):
     response = client.post("/auth/whoami")
     response.raise_for_status()
     assert response.json() == {"email": TEST_DATASITE_NAME}
+
+
+def test_get_diff_raw_bytes(client: TestClient):
+    local_data = b"This is my local data"
+    sig = signature.calculate(local_data)
+    response = client.post(
+        "/sync/get_diff",
+        json={
+            "path": f"{TEST_DATASITE_NAME}/{TEST_FILE}",
+            "signature": base64.b85encode(sig).decode("utf-8"),
+        },
+        headers={"Accept": "application/octet-stream"},
+    )
+
+    response.raise_for_status()
+    assert response.headers["content-type"] == "application/octet-stream"
+    new_data = py_fast_rsync.apply(local_data, response.content)
+    assert hashlib.sha256(new_data).hexdigest() == response.headers["X-Syft-Hash"]
+
+
+def test_get_diff_encoded_signature(client: TestClient):
+    local_data = b"This is my local data"
+    sig = signature.calculate(local_data)
+
+    file_path = Path(TEST_DATASITE_NAME) / TEST_FILE
+    response = get_diff(client, file_path, base64.b85encode(sig).decode("utf-8"))
+    assert response == get_diff(client, file_path, sig)
+
+
+def test_get_diff_cached(client: TestClient):
+    path = Path(TEST_DATASITE_NAME) / TEST_FILE
+    local_data = b"This is my local data"
+    sig = signature.calculate(local_data)
+
+    first = get_diff(client, path, sig)
+    second = get_diff(client, path, sig)
+    assert second.diff_bytes == first.diff_bytes
+
+    # a changed file is not served from the cache
+    new_data = b"This is the new server data"
+    FileStore(client.app_state["server_settings"]).put(path, new_data)
+    third = get_diff(client, path, sig)
+    assert py_fast_rsync.apply(local_data, third.diff_bytes) == new_data
+
+
+def test_get_diff_not_cached_for_racing_put(client: TestClient, monkeypatch):
+    path = Path(TEST_DATASITE_NAME) / TEST_FILE
+    local_data = b"This is my local data"
+    sig = signature.calculate(local_data)
+    store = FileStore(client.app_state["server_settings"])
+    old_file = store.get(path)
+
+    # a get racing with a put reads the new bytes, but the old metadata
+    store_get = FileStore.get
+
+    def get_racing_put(self, path):
+        file = store_get(self, path)
+        return file.model_copy(update={"data": b"This is the new server data"})
+
+    monkeypatch.setattr(FileStore, "get", get_racing_put)
+    get_diff(client, path, sig)
+    monkeypatch.setattr(FileStore, "get", store_get)
+
+    # the diff of the new bytes was not cached under the old hash
+    diff = get_diff(client, path, sig)
+    assert diff.hash == old_file.metadata.hash
+    assert py_fast_rsync.apply(local_data, diff.diff_bytes) == old_file.data
+
+
+def test_dir_state_permission_change(client: TestClient):
+    assert len(get_remote_state(client, Path(TEST_DATASITE_NAME))) == 3
+
+    # the cached permission tree is dropped when a permission file changes
+    perm_contents = json.dumps({"admin": [], "read": [], "write": []}).encode()
+    FileStore(client.app_state["server_settings"]).put(Path(TEST_DATASITE_NAME) / PERMFILE_FILE, perm_contents)
+    assert get_remote_state(client, Path(TEST_DATASITE_NAME)) == []
@@ -9,6 +9,7 @@ from fastapi.testclient import TestClient
 from syftbox.client.base import SyftClientInterface
 from syftbox.lib.client_config import SyftClientConfig
 from syftbox.lib.datasite import create_datasite
+from syftbox.lib.lib import get_datasites
 from syftbox.lib.workspace import SyftWorkspace
 from syftbox.server.server import app as server_app
 from syftbox.server.server import lifespan as server_lifespan
@@ -36,10 +37,14 @@ class MockClient(SyftClientInterface):
     @property
     def all_datasites(self) -> list[str]:
         """List all datasites in the workspace"""
-        return [d.name for d in self.workspace.datasites.iterdir() if (d.is_dir() and "@" in d.name)]
+        return get_datasites(self.workspace.datasites)
 
 
 def setup_datasite(tmp_path: Path, server_client: TestClient, email: str) -> SyftClientInterface:
+    # every datasite needs its own auth header, but they all share the server_client lifespan (settings, db, users)
+    datasite_client = TestClient(server_client.app, base_url=str(server_client.base_url))
+    datasite_client.app_state.update(server_client.app_state)
+
     syft_path = tmp_path / email
     config = SyftClientConfig(
         path=syft_path / "config.json",
@@ -52,14 +57,14 @@ def setup_datasite(tmp_path: Path, server_client: TestClient, email: str) -> Syf
     ws = SyftWorkspace(config.data_dir)
     ws.mkdirs()
     create_datasite(ws.datasites, email)
-    return MockClient(config, ws, server_client)
+    return MockClient(config, ws, datasite_client)
 
 
 @pytest.fixture(scope="function")
 def server_app_with_lifespan(tmp_path: Path) -> FastAPI:
     """
-    NOTE we are spawning a new server thread for each datasite,
-    this is not ideal but it is the same as using multiple uvicorn workers
+    NOTE the server lifespan runs once per test in server_client,
+    all datasites of a test talk to the same server state
     """
     path = tmp_path / "server"
     path.mkdir()
@@ -72,17 +77,15 @@ def server_app_with_lifespan(tmp_path: Path) -> FastAPI:
 
 
 @pytest.fixture()
-def datasite_1(tmp_path: Path, server_app_with_lifespan: FastAPI) -> SyftClientInterface:
+def datasite_1(tmp_path: Path, server_client: TestClient) -> SyftClientInterface:
     email = "user_1@openmined.org"
-    with TestClient(server_app_with_lifespan) as client:
-        return setup_datasite(tmp_path, client, email)
+    return setup_datasite(tmp_path, server_client, email)
 
 
 @pytest.fixture()
-def datasite_2(tmp_path: Path, server_app_with_lifespan: FastAPI) -> SyftClientInterface:
+def datasite_2(tmp_path: Path, server_client: TestClient) -> SyftClientInterface:
     email = "user_2@openmined.org"
-    with TestClient(server_app_with_lifespan) as client:
-        return setup_datasite(tmp_path, client, email)
+    return setup_datasite(tmp_path, server_client, email)
 
 
 @pytest.fixture(scope="function")
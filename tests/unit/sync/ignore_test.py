@@ -1,10 +1,20 @@
+import os
+import time
 from pathlib import Path
 
+import pathspec
+
 from syftbox.client.base import SyftClientInterface
 from syftbox.client.plugins.sync.sync import DatasiteState
 from syftbox.client.utils.dir_tree import create_dir_tree
 from syftbox.client.utils.display import display_file_tree
-from syftbox.lib.ignore import IGNORE_FILENAME, filter_ignored_paths
+from syftbox.lib.ignore import (
+    DEFAULT_IGNORE,
+    IGNORE_FILENAME,
+    compile_ignore_rules,
+    filter_ignored_paths,
+    get_ignore_matcher,
+)
 
 ignore_file = """
 # Exlude alice datasite
@@ -123,3 +133,52 @@ def test_ignore_hidden_files(datasite_1: SyftClientInterface) -> None:
 
     filtered_paths = filter_ignored_paths(datasite_1.workspace.datasites, paths, ignore_hidden_files=True)
     assert filtered_paths == [Path("visible_file.txt")]
+
+
+def test_compiled_ignore_rules_match_pathspec() -> None:
+    paths = [p for p, _ in paths_with_result] + [
+        "apps/my_app/main.py",
+        "john@example.com/apps/main.py",
+        "john@example.com/__pycache__/main.cpython-311.pyc",
+        "john@example.com/.venv/lib/site.py",
+        "john@example.com/Icon",
+        "_.syftignore",
+        ".syftkeep",
+    ]
+    for lines in [ignore_file, DEFAULT_IGNORE, DEFAULT_IGNORE + ignore_file]:
+        ignore_rules = pathspec.PathSpec.from_lines("gitwildmatch", lines.splitlines())
+        is_ignored = compile_ignore_rules(ignore_rules)
+        for path in paths:
+            assert is_ignored(Path(path)) == ignore_rules.match_file(path), path
+
+
+def test_ignore_matcher_cache(tmp_path: Path) -> None:
+    assert get_ignore_matcher(tmp_path) is None
+
+    ignore_path = tmp_path / IGNORE_FILENAME
+    ignore_path.write_text("*.tmp\n")
+    _set_mtime_in_past(ignore_path)
+    matcher = get_ignore_matcher(tmp_path)
+    assert matcher("file.tmp") and not matcher("file.txt")
+    assert get_ignore_matcher(tmp_path) is matcher
+
+    # changed ignore file is compiled again
+    ignore_path.write_text("*.tmp\n*.txt\n")
+    _set_mtime_in_past(ignore_path)
+    matcher = get_ignore_matcher(tmp_path)
+    assert matcher("file.tmp") and matcher("file.txt")
+
+
+def test_ignore_matcher_cache_skips_recent_files(tmp_path: Path) -> None:
+    ignore_path = tmp_path / IGNORE_FILENAME
+    ignore_path.write_text("*.tmp\n")
+
+    # a rewrite within the mtime resolution could keep the same stat, recent ignore files are compiled every time
+    matcher = get_ignore_matcher(tmp_path)
+    assert matcher("file.tmp")
+    assert get_ignore_matcher(tmp_path) is not matcher
+
+
+def _set_mtime_in_past(file_path: Path) -> None:
+    mtime = time.time() - 60
+    os.utime(file_path, (mtime, mtime))
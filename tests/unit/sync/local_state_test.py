@@ -0,0 +1,36 @@
+import copy
+import pickle
+from datetime import datetime, timezone
+from pathlib import Path
+
+from syftbox.client.plugins.sync.consumer import LocalState
+from syftbox.server.sync.models import FileMetadata
+
+
+def test_local_state_copy(tmp_path: Path):
+    path = Path("user@openmined.org/file.txt")
+    metadata = FileMetadata(
+        path=path,
+        hash="abc",
+        signature="sig",
+        file_size=3,
+        last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    local_state = LocalState(path=tmp_path / "local_syncstate.json")
+    local_state.save()
+    local_state.insert(path, metadata)
+
+    # the lock is not copied, every copy gets its own
+    for copied in [
+        copy.deepcopy(local_state),
+        local_state.model_copy(deep=True),
+        pickle.loads(pickle.dumps(local_state)),
+    ]:
+        assert copied.path == local_state.path
+        assert copied.states == local_state.states
+        assert copied.states is not local_state.states
+        assert copied._lock is not local_state._lock
+
+        copied.insert(path, None)
+        assert copied.states == {}
+        assert local_state.states == {path: metadata}
@@ -1,5 +1,4 @@
 import json
-import os
 import shutil
 import time
 from pathlib import Path
@@ -143,11 +142,6 @@ def test_create_file(server_client: TestClient, datasite_1: SyftClientInterface,
     ds1_state = datasite_states[0]
     assert ds1_state.email == datasite_1.email
 
-    print(ds1_state.get_out_of_sync_files())
-
-    print(f"datasites {[d.email for d in sync_client_2.get_datasite_states()]}")
-    sync_client_2.run_single_thread()
-
     assert_files_on_datasite(datasite_2, [Path(datasite_1.email) / "folder1" / "file.txt"])
 
 
@@ -195,7 +189,7 @@ def test_modify_and_pull(server_client: TestClient, datasite_1: SyftClientInterf
 
     # modify the file
     file_path = datasite_1.datasite / "folder1" / "file.txt"
-    new_content = fake.text(max_nb_chars=100_000)
+    new_content = "x" * 100_000
     file_path.write_text(new_content)
 
     assert file_path.read_text() == new_content
@@ -299,12 +293,51 @@ def test_delete_file(server_client: TestClient, datasite_1: SyftClientInterface,
     assert Path(datasite_1.email) / "folder1" / "file.txt" not in remote_paths
 
 
+def test_delete_remote_uses_current_server_state(
+    server_client: TestClient, datasite_1: SyftClientInterface, datasite_2: SyftClientInterface
+):
+    server_settings: ServerSettings = server_client.app_state["server_settings"]
+    sync_service_1 = SyncManager(datasite_1)
+    sync_service_2 = SyncManager(datasite_2)
+
+    tree = {
+        "folder1": {
+            "_.syftperm": SyftPermission.mine_with_public_write(datasite_1.email),
+            "file.txt": "content",
+        },
+    }
+    create_dir_tree(Path(datasite_1.datasite), tree)
+    sync_service_1.run_single_thread()
+    sync_service_2.run_single_thread()
+
+    # datasite_1 deletes the file, its server state is prefetched while it is still unchanged
+    (datasite_1.datasite / "folder1" / "file.txt").unlink()
+    sync_service_1.enqueue_datasite_changes(datasite=sync_service_1.get_datasite_states()[0])
+    items = []
+    while not sync_service_1.queue.empty():
+        items.append(sync_service_1.queue.get())
+    consumer = sync_service_1.consumer
+    consumer.prefetch_server_states([item.data.path for item in items])
+
+    # datasite_2 modifies the file on the server before datasite_1 processes the delete
+    file_path_2 = datasite_2.workspace.datasites / datasite_1.email / "folder1" / "file.txt"
+    file_path_2.write_text("modified")
+    sync_service_2.run_single_thread()
+
+    for item in items:
+        consumer.process_filechange(item)
+
+    # the modification is a conflict with the delete and wins, it is not deleted on the server
+    assert (server_settings.snapshot_folder / datasite_1.email / "folder1" / "file.txt").read_text() == "modified"
+    assert (datasite_1.datasite / "folder1" / "file.txt").read_text() == "modified"
+
+
 def test_invalid_sync_to_remote(server_client: TestClient, datasite_1: SyftClientInterface):
     sync_service_1 = SyncManager(datasite_1)
     sync_service_1.run_single_thread()
 
-    # random bytes 1 byte too large
-    too_large_content = os.urandom((MAX_FILE_SIZE_MB * 1024 * 1024) + 1)
+    # 1 byte too large, only the size is checked so the contents don't need to be random
+    too_large_content = b"\0" * ((MAX_FILE_SIZE_MB * 1024 * 1024) + 1)
     tree = {
         "valid": {
             "_.syftperm": SyftPermission.mine_with_public_write(datasite_1.email),
@@ -386,16 +419,12 @@ def test_sync_invalid_local_environment(datasite_1: SyftClientInterface):
     shutil.rmtree(sync_folder.as_posix())
 
     max_wait_time = 5
-    start_time = time.time()
-    while sync_service.is_alive() and time.time() - start_time < max_wait_time:
-        time.sleep(0.1)
+    sync_service.thread.join(timeout=max_wait_time)
     assert not sync_service.is_alive()
 
     # Restarting is not possible
     sync_service.start()
-    start_time = time.time()
-    while sync_service.is_alive() and time.time() - start_time < max_wait_time:
-        time.sleep(0.1)
+    sync_service.thread.join(timeout=max_wait_time)
     assert not sync_service.is_alive()
 
 
@@ -504,3 +533,16 @@ def test_n_datasites(tmp_path: Path, server_client: TestClient, datasite_1: Syft
     sync_service_1.run_single_thread()
 
     print(server_client.app_state["server_settings"].snapshot_folder)
+
+
+def test_stop_interrupts_sync_interval(datasite_1: SyftClientInterface):
+    sync_service = SyncManager(datasite_1)
+    sync_service.sync_interval = 60
+    sync_service.start()
+    time.sleep(0.5)
+
+    # stopping doesn't wait for the rest of the interval
+    start_time = time.monotonic()
+    sync_service.stop(blocking=True)
+    assert not sync_service.is_alive()
+    assert time.monotonic() - start_time < 10